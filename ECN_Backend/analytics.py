@@ -0,0 +1,171 @@
+# analytics.py
+"""
+Club activity analytics: an append-only activity_events log folded into
+club_daily_stats rollups.
+
+- Writes (join / leave / RSVP / attendance) call record_activity() inside
+  their own transaction.
+- Profile views are counted in memory by record_view() and written by
+  flush_views() as one weighted row per club, so the profile read path never
+  writes to the database.
+- compact_activity() moves log rows into the daily rollup in one statement
+  (DELETE ... RETURNING feeding INSERT ... ON CONFLICT DO UPDATE), and the
+  metrics endpoints only read the rollup.
+
+flush_views / compact_activity run periodically from jobs.py.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import ActivityEvent, Club, ClubDailyStats
+
+# activity kind -> club_daily_stats column
+KIND_COLUMNS = {
+    "view": "views",
+    "join": "joins",
+    "leave": "leaves",
+    "rsvp": "rsvps",
+    "attend": "attendances",
+}
+
+_COMPACT_BATCH = 5000
+
+
+def record_activity(session, club_id, kind: str, student_id=None, count: int = 1) -> None:
+    """Append one activity row in the caller's transaction."""
+    session.execute(
+        insert(ActivityEvent).values(club_id=club_id, student_id=student_id, kind=kind, count=count)
+    )
+
+
+# ---- Buffered profile views ----
+_view_counts: Counter = Counter()
+_view_lock = threading.Lock()
+
+
+def record_view(club_id) -> None:
+    """Count a profile view in memory; written out by flush_views()."""
+    with _view_lock:
+        _view_counts[club_id] += 1
+
+
+def flush_views(session) -> int:
+    """Write buffered views as one activity row per club. Returns views written."""
+    global _view_counts
+    with _view_lock:
+        pending, _view_counts = _view_counts, Counter()
+    if not pending:
+        return 0
+    try:
+        session.execute(
+            insert(ActivityEvent),
+            [{"club_id": cid, "kind": "view", "count": n} for cid, n in pending.items()],
+        )
+        session.flush()
+    except Exception:
+        # Put the counts back so the next flush retries them
+        with _view_lock:
+            _view_counts.update(pending)
+        raise
+    return sum(pending.values())
+
+
+# ---- Compaction ----
+def _compact_batch(session, batch_size: int) -> tuple[int, int]:
+    """Move one batch; returns (raw rows deleted, rollup rows upserted)."""
+    batch = (
+        select(ActivityEvent.id)
+        .order_by(ActivityEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(ActivityEvent)
+        .where(ActivityEvent.id.in_(batch.scalar_subquery()))
+        .returning(ActivityEvent.club_id, ActivityEvent.kind, ActivityEvent.count, ActivityEvent.occurred_at)
+        .cte("moved")
+    )
+    day = cast(func.timezone("UTC", moved.c.occurred_at), Date)
+    sums = [
+        func.coalesce(func.sum(moved.c.count).filter(moved.c.kind == kind), 0)
+        for kind in KIND_COLUMNS
+    ]
+    # Inner join drops activity for clubs deleted since it was logged
+    rollup = (
+        select(moved.c.club_id, day, *sums)
+        .join(Club, Club.id == moved.c.club_id)
+        .group_by(moved.c.club_id, day)
+    )
+    columns = list(KIND_COLUMNS.values())
+    stmt = pg_insert(ClubDailyStats).from_select(["club_id", "day", *columns], rollup)
+    upserted = stmt.on_conflict_do_update(
+        index_elements=[ClubDailyStats.club_id, ClubDailyStats.day],
+        set_={c: getattr(ClubDailyStats, c) + stmt.excluded[c] for c in columns},
+    ).returning(ClubDailyStats.club_id).cte("upserted")
+    counts = select(
+        select(func.count()).select_from(moved).scalar_subquery(),
+        select(func.count()).select_from(upserted).scalar_subquery(),
+    )
+    deleted, touched = session.execute(counts).one()
+    return deleted, touched
+
+
+def compact_activity(session, batch_size: int = _COMPACT_BATCH, max_batches: int = 20) -> int:
+    """
+    Fold activity_events into club_daily_stats in batches. Safe to run from
+    several processes at once (SKIP LOCKED). Returns rollup rows touched.
+    """
+    touched = 0
+    for _ in range(max_batches):
+        # a batch of deleted clubs' rows upserts nothing but still counts as progress
+        deleted, n = _compact_batch(session, batch_size)
+        touched += n
+        if deleted == 0:
+            break
+    return touched
+
+
+# ---- Reads ----
+def daily_totals(session, club_ids, days: int = 30) -> Dict[Any, Dict[str, Dict[str, int]]]:
+    """
+    {club_id: {"current": {...}, "previous": {...}}} summing club_daily_stats over
+    the last `days` days and the `days` before that (UTC days).
+    """
+    if not club_ids:
+        return {}
+    today = datetime.now(timezone.utc).date()
+    current_start = today - timedelta(days=days - 1)
+    previous_start = current_start - timedelta(days=days)
+    in_current = ClubDailyStats.day >= current_start
+
+    columns = list(KIND_COLUMNS.values())
+    selected = []
+    for c in columns:
+        col = getattr(ClubDailyStats, c)
+        selected.append(func.coalesce(func.sum(col).filter(in_current), 0))
+        selected.append(func.coalesce(func.sum(col).filter(~in_current), 0))
+
+    rows = session.execute(
+        select(ClubDailyStats.club_id, *selected)
+        .where(
+            ClubDailyStats.club_id.in_(list(club_ids)),
+            ClubDailyStats.day >= previous_start,
+        )
+        .group_by(ClubDailyStats.club_id)
+    ).all()
+
+    out = {}
+    for row in rows:
+        values = row[1:]
+        out[row[0]] = {
+            "current": {c: values[2 * i] for i, c in enumerate(columns)},
+            "previous": {c: values[2 * i + 1] for i, c in enumerate(columns)},
+        }
+    return out
@@ -0,0 +1,324 @@
+# bench/endpoint_suite.py
+"""
+Per-route latency, throughput and SQL cost for the api_bp endpoints.
+
+Boots app.create_app() against ECN_DATABASE_URL (required), makes sure
+a known synthetic dataset is present (seed_data.seed_bulk, skipped when the
+rows for --data-seed already exist), picks fixtures from it, then drives each
+route through the Flask test client from --concurrency threads:
+
+  clubs list (every sort), text + smart search, events feed, club profile /
+  events / members / metrics, batch metrics, my-clubs, dashboard,
+  RSVP toggle, join / leave
+
+For each route it reports p50/p95/p99 latency, requests per second, SQL
+statements and rows fetched per request, and writes everything as JSON so two
+runs (e.g. two commits) can be compared with --compare.
+
+Write routes undo themselves: every worker uses its own student, RSVP toggles
+run in on/off pairs and each join is followed by a leave.
+
+The response cache is disabled unless --response-cache is given, so the
+numbers measure the route itself rather than cache hits.
+
+    cd ECN_Backend && python bench/endpoint_suite.py --requests 200 --concurrency 4 --out bench.json
+    python bench/endpoint_suite.py --compare before.json bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SORTS = ("discoverability", "members", "rating", "activity", "updated")
+
+
+# ---- SQL accounting ----
+class _SqlCounter:
+    """Statements and rows fetched by the current thread's requests."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        self._local.statements = 0
+        self._local.rows = 0
+
+    def snapshot(self) -> tuple[int, int]:
+        return getattr(self._local, "statements", 0), getattr(self._local, "rows", 0)
+
+    def install(self, engine) -> None:
+        from sqlalchemy import event
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            self._local.statements = getattr(self._local, "statements", 0) + 1
+            if cursor.description is not None and cursor.rowcount > 0:
+                self._local.rows = getattr(self._local, "rows", 0) + cursor.rowcount
+
+
+# ---- Dataset and fixtures ----
+def _ensure_dataset(sizes: list[int], seed: int) -> None:
+    from db_ops import get_session
+    from models import Student
+    from seed_data import seed_bulk
+
+    with get_session() as s:
+        present = s.query(Student.id).filter(Student.netid == f"load{seed}-s0").first()
+    if present:
+        print(f"[BENCH] dataset load{seed} already present")
+        return
+    students, clubs, events, rsvps = sizes
+    seed_bulk(students=students, clubs=clubs, events=events, rsvps=rsvps, seed=seed)
+
+
+def _fixtures(seed: int, workers: int) -> dict:
+    """Deterministic ids from the load{seed} dataset."""
+    from sqlalchemy import func, select
+
+    from db_ops import get_session
+    from event_lifecycle import upcoming_clause
+    from models import Club, ClubMembership, Event, Student
+
+    tag = f"load{seed}"
+    with get_session() as s:
+        clubs = dict(s.execute(
+            select(Club.contact_email, Club.id).where(Club.contact_email.like(f"{tag}-c%"))
+        ).all())
+        popular = clubs[f"{tag}-c0@emory.edu"]
+        by_rank = [clubs[k] for k in sorted(clubs, key=lambda k: int(k.split("-c")[1].split("@")[0]))]
+        median = by_rank[len(by_rank) // 2]
+
+        # the load student in the most clubs: the heaviest my-clubs / dashboard
+        busy = s.execute(
+            select(ClubMembership.student_id)
+            .join(Student, Student.id == ClubMembership.student_id)
+            .where(Student.netid.like(f"{tag}-s%"))
+            .group_by(ClubMembership.student_id)
+            .order_by(func.count().desc(), ClubMembership.student_id)
+            .limit(1)
+        ).scalar_one()
+
+        # one student per worker who is not in the median club (join / leave, RSVP)
+        members = select(ClubMembership.student_id).where(ClubMembership.club_id == median)
+        writers = s.execute(
+            select(Student.id)
+            .where(Student.netid.like(f"{tag}-s%"), Student.id.not_in(members))
+            .order_by(Student.netid)
+            .limit(workers)
+        ).scalars().all()
+
+        now = datetime.now(timezone.utc)
+        event = s.execute(
+            select(Event.id)
+            .where(Event.club_id == median, upcoming_clause(now))
+            .order_by(Event.start_time, Event.id)
+            .limit(1)
+        ).scalar_one_or_none()
+        if event is None:
+            event = s.execute(
+                select(Event.id).where(upcoming_clause(now), Event.rsvp_limit.is_(None))
+                .order_by(Event.start_time, Event.id).limit(1)
+            ).scalar_one()
+
+    return {
+        "popular": str(popular), "median": str(median), "batch": [str(c) for c in by_rank[:20]],
+        "student": str(busy), "writers": [str(w) for w in writers], "event": str(event),
+    }
+
+
+def _scenarios(fx: dict) -> list[dict]:
+    """name, steps; a step is (method, url, body_fn(worker) or None)."""
+    c, m = fx["popular"], fx["median"]
+    sc = [{"name": f"clubs_list[{sort}]", "steps": [("GET", f"/api/clubs?sort={sort}", None)]} for sort in SORTS]
+    sc += [
+        {"name": "clubs_search", "steps": [("GET", "/api/clubs?q=finance", None)]},
+        {"name": "clubs_search_smart", "steps": [("GET", "/api/clubs?smart=true&q=finance", None)]},
+        {"name": "events_feed", "steps": [("GET", "/api/events?limit=50", None)]},
+        {"name": "club_profile", "steps": [("GET", f"/api/clubs/{c}/profile", None)]},
+        {"name": "club_events", "steps": [("GET", f"/api/clubs/{c}/events", None)]},
+        {"name": "club_members", "steps": [("GET", f"/api/clubs/{c}/members", None)]},
+        {"name": "club_metrics", "steps": [("GET", f"/api/clubs/{c}/metrics", None)]},
+        {"name": "clubs_metrics_batch", "steps": [("GET", "/api/clubs/metrics?ids=" + ",".join(fx["batch"]), None)]},
+        {"name": "my_clubs", "steps": [("GET", f"/api/students/{fx['student']}/my-clubs", None)]},
+        {"name": "dashboard", "steps": [("GET", f"/api/students/{fx['student']}/dashboard", None)]},
+    ]
+    writer = lambda w: {"userId": fx["writers"][w]}  # noqa: E731
+    sc += [
+        {"name": "rsvp_toggle", "steps": [
+            ("POST", f"/api/events/{fx['event']}/rsvp", writer),
+            ("POST", f"/api/events/{fx['event']}/rsvp", writer),
+        ]},
+        {"name": "join_leave", "steps": [
+            ("POST", f"/api/clubs/{m}/join", writer),
+            ("POST", f"/api/clubs/{m}/leave", writer),
+        ]},
+    ]
+    return sc
+
+
+# ---- Driver ----
+def _percentile(sorted_ms: list[float], p: float) -> float:
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * p))]
+
+
+def _run_scenario(app, counter: _SqlCounter, scenario: dict, requests: int, workers: int, warmup: int) -> dict:
+    per_worker = max(1, requests // (workers * len(scenario["steps"])))
+    samples: list[tuple[float, int, int, int, str]] = []
+    lock = threading.Lock()
+
+    def worker(w: int) -> None:
+        client = app.test_client()
+        local = []
+        for i in range(warmup + per_worker):
+            for method, url, body in scenario["steps"]:
+                counter.reset()
+                t0 = time.perf_counter()
+                resp = client.open(url, method=method, json=body(w) if body else None)
+                ms = (time.perf_counter() - t0) * 1000
+                if i >= warmup:
+                    statements, rows = counter.snapshot()
+                    local.append((ms, resp.status_code, statements, rows, resp.headers.get("X-Cache", "")))
+        with lock:
+            samples.extend(local)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    wall = time.perf_counter() - t0
+
+    lat = sorted(s[0] for s in samples)
+    statuses: dict[str, int] = {}
+    for s in samples:
+        statuses[str(s[1])] = statuses.get(str(s[1]), 0) + 1
+    return {
+        "requests": len(samples),
+        "p50_ms": round(_percentile(lat, 0.50), 2),
+        "p95_ms": round(_percentile(lat, 0.95), 2),
+        "p99_ms": round(_percentile(lat, 0.99), 2),
+        "mean_ms": round(statistics.fmean(lat), 2),
+        "rps": round(len(samples) / wall, 1),
+        "statements_per_req": round(statistics.fmean(s[2] for s in samples), 2),
+        "rows_per_req": round(statistics.fmean(s[3] for s in samples), 1),
+        "cache_hits": sum(1 for s in samples if s[4] == "HIT"),
+        "status": statuses,
+    }
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_table(routes: dict) -> None:
+    print(f"{'route':<28} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'sql':>6} {'rows':>8}  status")
+    for name, r in routes.items():
+        print(f"{name:<28} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rps']:>8.1f} "
+              f"{r['statements_per_req']:>6.1f} {r['rows_per_req']:>8.1f}  {r['status']}")
+
+
+def _ratio(old: float, new: float) -> float:
+    return new / old if old else float("nan")
+
+
+def compare(old_path: str, new_path: str) -> None:
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    print(f"{'route':<28} {'p50 old':>9} {'p50 new':>9} {'x':>6} {'p95 x':>6} {'sql old':>8} {'sql new':>8}")
+    for name, n in new["routes"].items():
+        o = old["routes"].get(name)
+        if o is None:
+            print(f"{name:<28} {'-':>9} {n['p50_ms']:>9.1f}")
+            continue
+        print(f"{name:<28} {o['p50_ms']:>9.1f} {n['p50_ms']:>9.1f} {_ratio(o['p50_ms'], n['p50_ms']):>6.2f} "
+              f"{_ratio(o['p95_ms'], n['p95_ms']):>6.2f} {o['statements_per_req']:>8.1f} {n['statements_per_req']:>8.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="api_bp endpoint benchmark suite")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured iterations per worker")
+    parser.add_argument("--dataset", default="5000,200,10000,100000",
+                        help="students,clubs,events,rsvps for seed_bulk when missing")
+    parser.add_argument("--data-seed", type=int, default=7)
+    parser.add_argument("--only", default="", help="comma-separated route names / prefixes")
+    parser.add_argument("--response-cache", action="store_true", help="keep the in-process response cache on")
+    parser.add_argument("--out", default="", help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    # read at import time by response_cache
+    os.environ.setdefault("ECN_RESPONSE_CACHE", "true" if args.response_cache else "false")
+
+    from app import create_app
+    from db_ops import create_all, engine, require_database_url
+
+    require_database_url("endpoint_suite")
+    create_all()
+    app = create_app()
+    counter = _SqlCounter()
+    counter.install(engine)
+
+    sizes = [int(x) for x in args.dataset.split(",")]
+    _ensure_dataset(sizes, args.data_seed)
+    fx = _fixtures(args.data_seed, args.concurrency)
+    if len(fx["writers"]) < args.concurrency:
+        print("[BENCH] not enough non-member students for the write routes", file=sys.stderr)
+        return 1
+
+    only = [p for p in args.only.split(",") if p]
+    routes = {}
+    for scenario in _scenarios(fx):
+        if only and not any(scenario["name"].startswith(p) for p in only):
+            continue
+        routes[scenario["name"]] = _run_scenario(
+            app, counter, scenario, args.requests, args.concurrency, args.warmup
+        )
+        print(f"[BENCH] {scenario['name']}: p50 {routes[scenario['name']]['p50_ms']} ms")
+
+    _print_table(routes)
+    result = {
+        "meta": {
+            "commit": _git_rev(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "dataset": {"seed": args.data_seed, "sizes": sizes},
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "responseCache": os.environ["ECN_RESPONSE_CACHE"] == "true",
+            "fixtures": fx,
+        },
+        "routes": routes,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+        print(f"[BENCH] wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
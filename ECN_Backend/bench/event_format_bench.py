@@ -0,0 +1,118 @@
+# bench/event_format_bench.py
+"""
+Cost of shaping and serializing N events (default 10k) into an event-list
+response, before and after event_format / json_provider.
+
+  before: per-row ZoneInfo("America/New_York") + astimezone + two strftime
+          calls, serialized by Flask's stdlib JSON provider
+  after:  event_format.display_many (cached tz, per-minute memo), serialized
+          by the orjson provider when orjson is installed
+
+Needs no database; events are in-memory stand-ins with start times on
+half-hour slots over the next 90 days.
+
+    cd ECN_Backend && python bench/event_format_bench.py --events 10000 --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from event_format import display_many  # noqa: E402
+from json_provider import install_json_provider  # noqa: E402
+
+
+def _events(n: int) -> list:
+    rng = random.Random(42)
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            title=f"Event {i}",
+            location=rng.choice(["Student Center", "Library 312", None]),
+            start_time=base + timedelta(minutes=30 * rng.randrange(90 * 48)),
+        )
+        for i in range(n)
+    ]
+
+
+def _legacy_rows(events) -> list:
+    rows = []
+    for e in events:
+        from zoneinfo import ZoneInfo
+        est_time = e.start_time.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York"))
+        rows.append({
+            "id": str(e.id),
+            "name": e.title,
+            "date": est_time.strftime("%b %d"),
+            "time": est_time.strftime("%-I:%M %p"),
+            "startTime": e.start_time.isoformat(),
+            "location": e.location,
+        })
+    return rows
+
+
+def _rows(events) -> list:
+    return [
+        {
+            "id": str(e.id),
+            "name": e.title,
+            "date": date_str,
+            "time": time_str,
+            "startTime": e.start_time.isoformat(),
+            "location": e.location,
+        }
+        for e, (date_str, time_str) in zip(events, display_many(e.start_time for e in events))
+    ]
+
+
+def _time(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="event list formatting + JSON cost")
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    stdlib_app = Flask("before")
+    fast_app = Flask("after")
+    provider = install_json_provider(fast_app)
+
+    assert _legacy_rows(events) == _rows(events), "formatting changed"
+
+    results = {}
+    for label, app, shape in (("before", stdlib_app, _legacy_rows), ("after", fast_app, _rows)):
+        rows = shape(events)
+        with app.app_context():
+            fmt = _time(lambda: shape(events), args.runs)
+            ser = _time(lambda: app.json.response(rows), args.runs)
+        results[label] = (fmt, ser)
+
+    print(f"{args.events} events, median of {args.runs} runs (after: {provider} JSON)")
+    print(f"{'':>8} {'format ms':>10} {'json ms':>9} {'total ms':>9}")
+    for label, (fmt, ser) in results.items():
+        print(f"{label:>8} {fmt:>10.1f} {ser:>9.1f} {fmt + ser:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# bench/my_clubs_bench.py
+"""
+Latency of GET /api/students/<id>/my-clubs as a student's club count grows.
+
+For each size a fresh student joins that many throwaway clubs, each with two
+recent and three upcoming events, and the endpoint is timed. The dashboard is
+built from a fixed number of queries, so the median should stay roughly flat
+from 5 to 200 clubs instead of growing with ~3 queries per club.
+
+Runs against ECN_DATABASE_URL (required); the fixture rows are
+deleted afterwards.
+
+    cd ECN_Backend && python bench/my_clubs_bench.py --sizes 5,25,50,100,200 --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event
+
+from rsvp_stress import make_app
+from club_stats import refresh_club_stats
+from db_ops import engine, get_session, require_database_url
+from memberships import add_member
+from models import Club, Event, Student
+
+
+def _make_fixture(n_clubs: int):
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+    with get_session() as s:
+        student = Student(netid=f"bench-{tag}", name="bench", email=f"bench-{tag}@example.edu")
+        clubs = [Club(name=f"my-clubs-bench-{tag}-{i}") for i in range(n_clubs)]
+        s.add(student)
+        s.add_all(clubs)
+        s.flush()
+        for c in clubs:
+            for offset in (-20, -3, 2, 9, 16):
+                start = now + timedelta(days=offset)
+                s.add(Event(club_id=c.id, title=f"e{offset}", start_time=start,
+                            end_time=start + timedelta(hours=1)))
+            add_member(s, c.id, student.id)
+        refresh_club_stats(s, [c.id for c in clubs])
+        return student.id, [c.id for c in clubs]
+
+
+def _drop_fixture(student_id, club_ids) -> None:
+    with get_session() as s:
+        s.execute(delete(Club).where(Club.id.in_(club_ids)))
+        s.execute(delete(Student).where(Student.id == student_id))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="my-clubs latency vs club count")
+    parser.add_argument("--sizes", default="5,25,50,100,200")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    require_database_url("my_clubs_bench")
+
+    statements = {"n": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        statements["n"] += 1
+
+    client = make_app().test_client()
+    print(f"{'clubs':>6} {'median ms':>10} {'p95 ms':>8} {'queries':>8}")
+    for size in (int(x) for x in args.sizes.split(",")):
+        student_id, club_ids = _make_fixture(size)
+        try:
+            url = f"/api/students/{student_id}/my-clubs"
+            resp = client.get(url)  # warm-up
+            assert resp.status_code == 200 and len(resp.get_json()) == size, resp.get_data(as_text=True)
+
+            timings = []
+            statements["n"] = 0
+            for _ in range(args.runs):
+                t0 = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - t0) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{size:>6} {statistics.median(timings):>10.1f} {p95:>8.1f} "
+                  f"{statements['n'] / args.runs:>8.1f}")
+        finally:
+            _drop_fixture(student_id, club_ids)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
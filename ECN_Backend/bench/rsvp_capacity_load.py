@@ -0,0 +1,92 @@
+# bench/rsvp_capacity_load.py
+"""
+Flash-crowd load check for capacity-limited RSVPs.
+
+Fires 1,000 simultaneous RSVPs at a 100-seat event and checks that exactly
+100 are confirmed, the rest are waitlisted, and the event counter agrees.
+Then a batch of confirmed students drop out and the script checks that the
+same number of waitlisted students were promoted, earliest rsvp_time first.
+
+Runs against ECN_DATABASE_URL (required); the fixture rows are
+deleted afterwards.
+
+    cd ECN_Backend && python bench/rsvp_capacity_load.py --students 1000 --capacity 100
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from rsvp_stress import drop_fixture, make_app, make_fixture, wave
+from db_ops import get_session, require_database_url
+from models import ClubStats, Event, EventRsvp
+
+
+def _snapshot(event_id, club_id):
+    with get_session() as s:
+        rows = s.execute(
+            select(EventRsvp.student_id, EventRsvp.rsvp_status, EventRsvp.rsvp_time, EventRsvp.id)
+            .where(EventRsvp.event_id == event_id)
+            .order_by(EventRsvp.rsvp_time, EventRsvp.id)
+        ).all()
+        counter = s.scalar(select(Event.rsvp_count).where(Event.id == event_id))
+        stats = s.scalar(select(ClubStats.total_registered).where(ClubStats.club_id == club_id))
+    going = [r.student_id for r in rows if r.rsvp_status == "going"]
+    waiting = [r.student_id for r in rows if r.rsvp_status == "waitlisted"]
+    return going, waiting, counter, stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Capacity / waitlist load check")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--dropouts", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+    require_database_url("rsvp_capacity_load")
+
+    app = make_app()
+    club_id, event_id, student_ids = make_fixture(args.students, rsvp_limit=args.capacity)
+    cap, n = args.capacity, len(student_ids)
+    failures = []
+    try:
+        results, elapsed = wave(app, event_id, student_ids, args.workers)
+        going, waiting, counter, stats = _snapshot(event_id, club_id)
+        print(f"[signup] {n} RSVPs in {elapsed:.2f}s ({n / elapsed:.0f}/s): "
+              f"confirmed={len(going)} waitlisted={len(waiting)} rsvp_count={counter} club_stats={stats}")
+
+        confirmed_responses = sum(1 for r in results if r["rsvped"])
+        if not len(going) == counter == stats == confirmed_responses == cap:
+            failures.append(f"signup: expected exactly {cap} confirmed everywhere")
+        if len(waiting) != n - cap:
+            failures.append(f"signup: expected {n - cap} waitlisted")
+        positions = sorted(r["waitlistPosition"] for r in results if r["waitlisted"])
+        if positions != list(range(1, n - cap + 1)):
+            failures.append("signup: reported waitlist positions are not 1..N")
+
+        leavers = going[:args.dropouts]
+        expect_promoted = set(waiting[:len(leavers)])
+        results, elapsed = wave(app, event_id, leavers, args.workers)
+        going_after, waiting_after, counter, stats = _snapshot(event_id, club_id)
+        print(f"[dropout] {len(leavers)} un-RSVPs in {elapsed:.2f}s: "
+              f"confirmed={len(going_after)} waitlisted={len(waiting_after)} rsvp_count={counter}")
+
+        if not len(going_after) == counter == stats == cap:
+            failures.append(f"dropout: expected {cap} confirmed after promotion")
+        if not expect_promoted <= set(going_after):
+            failures.append("dropout: promotions did not follow waitlist order")
+        if len(waiting_after) != n - cap - len(leavers):
+            failures.append("dropout: waitlist did not shrink by the number of dropouts")
+    finally:
+        drop_fixture(club_id, student_ids)
+
+    for f in failures:
+        print("FAIL", f)
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
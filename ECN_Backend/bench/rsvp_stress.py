@@ -0,0 +1,137 @@
+# bench/rsvp_stress.py
+"""
+Concurrency stress check for POST /api/events/<id>/rsvp.
+
+Creates a throwaway club, event and N students, fires every student's RSVP
+at the one event in parallel, then toggles them all off again in parallel.
+After each wave Event.rsvp_count, the event_rsvps row count and
+club_stats.total_registered must all agree, and the counts returned to the
+clients must be exactly 1..N (every increment observed once, none lost).
+
+Runs against ECN_DATABASE_URL (required); the fixture rows are
+deleted afterwards.
+
+    cd ECN_Backend && python bench/rsvp_stress.py --students 300 --workers 32
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import delete, func, select
+
+from club_stats import refresh_club_stats
+from db_ops import create_all, get_session, require_database_url
+from models import Club, ClubStats, Event, EventRsvp, Student
+from routes import api_bp
+
+
+def make_fixture(n_students: int, rsvp_limit: int | None = None):
+    tag = uuid.uuid4().hex[:8]
+    with get_session() as s:
+        club = Club(name=f"rsvp-stress-{tag}")
+        s.add(club)
+        s.flush()
+        start = datetime.now(timezone.utc) + timedelta(days=3)
+        event = Event(
+            club_id=club.id,
+            title=f"RSVP stress {tag}",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            rsvp_limit=rsvp_limit,
+        )
+        students = [
+            Student(
+                netid=f"rsvp-stress-{tag}-{i}",
+                name=f"stress {i}",
+                email=f"rsvp-stress-{tag}-{i}@example.edu",
+            )
+            for i in range(n_students)
+        ]
+        s.add(event)
+        s.add_all(students)
+        s.flush()
+        refresh_club_stats(s, [club.id])
+        return club.id, event.id, [st.id for st in students]
+
+
+def drop_fixture(club_id, student_ids) -> None:
+    with get_session() as s:
+        s.execute(delete(Club).where(Club.id == club_id))
+        s.execute(delete(Student).where(Student.id.in_(student_ids)))
+
+
+def counts(event_id, club_id) -> tuple[int, int, int]:
+    with get_session() as s:
+        counter = s.scalar(select(Event.rsvp_count).where(Event.id == event_id))
+        rows = s.scalar(select(func.count(EventRsvp.id)).where(EventRsvp.event_id == event_id))
+        stats = s.scalar(select(ClubStats.total_registered).where(ClubStats.club_id == club_id))
+        return counter, rows, stats
+
+
+def wave(app, event_id, student_ids, workers: int) -> tuple[list[dict], float]:
+    def fire(student_id):
+        client = app.test_client()
+        resp = client.post(f"/api/events/{event_id}/rsvp", json={"userId": str(student_id)})
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return resp.get_json()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fire, student_ids))
+    return results, time.perf_counter() - t0
+
+
+def make_app() -> Flask:
+    create_all()
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix="/api")
+    return app
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Parallel RSVP stress check")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+    require_database_url("rsvp_stress")
+
+    app = make_app()
+
+    club_id, event_id, student_ids = make_fixture(args.students)
+    n = len(student_ids)
+    failures = []
+    try:
+        for label, expect_rsvped, expect_total in (("on", True, n), ("off", False, 0)):
+            results, elapsed = wave(app, event_id, student_ids, args.workers)
+            counter, rows, stats = counts(event_id, club_id)
+            print(f"[{label}] {n} toggles in {elapsed:.2f}s "
+                  f"({n / elapsed:.0f}/s): rsvp_count={counter} rows={rows} club_stats={stats}")
+
+            if any(r["rsvped"] is not expect_rsvped for r in results):
+                failures.append(f"{label}: unexpected rsvped flag in a response")
+            if not counter == rows == stats == expect_total:
+                failures.append(f"{label}: expected {expect_total} everywhere")
+            seen = sorted(r["registered"] for r in results)
+            want = list(range(1, n + 1)) if expect_rsvped else list(range(0, n))
+            if seen != want:
+                failures.append(f"{label}: returned counts are not a permutation of {want[0]}..{want[-1]}")
+    finally:
+        drop_fixture(club_id, student_ids)
+
+    for f in failures:
+        print("FAIL", f)
+    print("OK" if not failures else f"{len(failures)} failure(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
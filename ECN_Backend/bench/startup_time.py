@@ -0,0 +1,122 @@
+# bench/startup_time.py
+"""
+Cold-start cost of the API process: import the app and build it, as a gunicorn
+worker (wsgi.py) would, in a fresh interpreter under `python -X importtime`.
+
+Reports the median wall time over --runs, and from the last run's importtime
+log the slowest direct imports of app.py (cumulative, i.e. what a lazy import could
+save) and the slowest modules by their own time. No database connection is
+made: start_jobs=False skips the pool warmup and background jobs, and schema
+DDL only runs with ECN_CREATE_SCHEMA=true.
+
+    cd ECN_Backend && python bench/startup_time.py --runs 5 --top 15
+    cd ECN_Backend && python bench/startup_time.py --budget-ms 1500   # exit 1 if slower
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BOOT = "from app import create_app; create_app(start_jobs=False)"
+# "import time:   self [us] | cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _boot_once() -> tuple[float, str]:
+    env = dict(os.environ, ECN_CREATE_SCHEMA="false", PYTHONDONTWRITEBYTECODE="1")
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-4000:])
+        raise SystemExit(f"app failed to start (exit {proc.returncode})")
+    return wall_ms, proc.stderr
+
+
+def _parse(log: str) -> list[dict]:
+    rows = []
+    for line in log.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "selfMs": int(m.group(1)) / 1000,
+                "cumulativeMs": int(m.group(2)) / 1000,
+                "depth": len(m.group(3)) // 2,
+            })
+    return rows
+
+
+def _app_imports(rows: list[dict]) -> list[dict]:
+    """Direct imports of app.py (importtime prints children before their parent)."""
+    pending = []
+    for r in rows:
+        if r["depth"] == 1:
+            pending.append(r)
+        elif r["depth"] == 0:
+            if r["module"] == "app":
+                return pending
+            pending = []
+    return []
+
+
+def _top(rows: list[dict], key: str, n: int) -> list[dict]:
+    return sorted(rows, key=lambda r: r[key], reverse=True)[:n]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="app cold-start / import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median wall time exceeds this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    walls, log = [], ""
+    for _ in range(max(1, args.runs)):
+        wall_ms, log = _boot_once()
+        walls.append(wall_ms)
+    rows = _parse(log)
+    app_row = next((r for r in rows if r["depth"] == 0 and r["module"] == "app"), None)
+
+    report = {
+        "runs": len(walls),
+        "wallMedianMs": round(statistics.median(walls), 1),
+        "wallMinMs": round(min(walls), 1),
+        "appImportMs": round(app_row["cumulativeMs"], 1) if app_row else None,
+        "modules": len(rows),
+        "topCumulative": _top(_app_imports(rows), "cumulativeMs", args.top),
+        "topSelf": _top(rows, "selfMs", args.top),
+    }
+    over = args.budget_ms is not None and report["wallMedianMs"] > args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"wall: median {report['wallMedianMs']}ms, min {report['wallMinMs']}ms over {len(walls)} runs")
+        print(f"import app: {report['appImportMs']}ms, {report['modules']} modules loaded (last run)")
+        sections = (
+            ("app.py imports by cumulative ms", "topCumulative", "cumulativeMs"),
+            ("modules by self ms", "topSelf", "selfMs"),
+        )
+        for title, name, key in sections:
+            print(f"\n{title}:")
+            for r in report[name]:
+                print(f"  {r[key]:>8.1f}  {r['module']}")
+        if args.budget_ms is not None:
+            print(f"\nbudget {args.budget_ms:g}ms: {'OVER' if over else 'ok'}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# club_metrics.py
+"""
+Officer-dashboard metrics for clubs.
+
+All event / RSVP aggregation happens in one grouped query (COUNT ... FILTER)
+over events LEFT JOIN event_rsvps, for one club or many at once, so no Event
+rows are loaded into Python. Member counts come from club_stats; growth and
+profile views come from the club_daily_stats rollups (see analytics.py).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy import and_, func, select
+
+from analytics import daily_totals
+from club_stats import get_club_stats
+from models import Club, Event, EventRsvp
+from rsvps import REGISTERED_STATUSES
+
+
+def _month_windows(now: datetime) -> tuple[datetime, datetime]:
+    """(start of the 30-60 day window, start of the last-30-days window)."""
+    last_month_start = (now - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+    prev_month_start = (now - timedelta(days=60)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return prev_month_start, last_month_start
+
+
+def event_aggregates(session, club_ids, now: datetime) -> Dict[Any, Dict[str, int]]:
+    """
+    {club_id: {events, registered, attended, prevRegistered, prevAttended}} from a
+    single GROUP BY; "prev" is events starting 30-60 days ago.
+    """
+    if not club_ids:
+        return {}
+    prev_start, last_start = _month_windows(now)
+    registered = EventRsvp.rsvp_status.in_(REGISTERED_STATUSES)
+    attended = EventRsvp.attended.is_(True)
+    in_prev = and_(Event.start_time >= prev_start, Event.start_time < last_start)
+
+    rows = session.execute(
+        select(
+            Event.club_id,
+            func.count(Event.id.distinct()),
+            func.count(EventRsvp.id).filter(registered),
+            func.count(EventRsvp.id).filter(attended),
+            func.count(EventRsvp.id).filter(registered, in_prev),
+            func.count(EventRsvp.id).filter(attended, in_prev),
+        )
+        .select_from(Event)
+        .outerjoin(EventRsvp, EventRsvp.event_id == Event.id)
+        .where(Event.club_id.in_(list(club_ids)))
+        .group_by(Event.club_id)
+    ).all()
+    keys = ("events", "registered", "attended", "prevRegistered", "prevAttended")
+    return {row[0]: dict(zip(keys, row[1:])) for row in rows}
+
+
+def _growth_pct(current: int, previous: int) -> float:
+    return round((current - previous) / previous * 100, 1) if previous else 0.0
+
+
+def _metrics_payload(club: Club, members: int, agg: Dict[str, int], daily: Dict[str, Dict[str, int]],
+                     now: datetime) -> Dict[str, Any]:
+    events = agg.get("events", 0)
+    total_registered = agg.get("registered", 0)
+    total_attended = agg.get("attended", 0)
+    attendance_rate = round(
+        (total_attended / total_registered) * 100, 1
+    ) if total_registered else 0.0
+
+    current = daily.get("current", {})
+    previous = daily.get("previous", {})
+
+    # Member growth: net joins over the last 30 days vs. membership 30 days ago
+    net_joins = current.get("joins", 0) - current.get("leaves", 0)
+    member_growth = _growth_pct(members, members - net_joins)
+
+    # Profile views over the last 30 days, and change vs. the 30 days before
+    profile_views = current.get("views", 0)
+    profile_growth = _growth_pct(profile_views, previous.get("views", 0))
+
+    # Freshness score - based on last updated date
+    if club.last_updated_at:
+        days_since_update = (now - club.last_updated_at).days
+        freshness_score = max(0, min(100, 100 - (days_since_update * 2)))
+    else:
+        freshness_score = 50  # Neutral score if never updated
+
+    # Engagement score - combine attendance rate and event count
+    event_factor = min(100, events * 10)  # More events = higher engagement
+    engagement_score = min(100, int(0.5 * attendance_rate + 0.3 * event_factor + 0.2 * freshness_score))
+
+    event_attendance = int(round(total_attended / events)) if events else 0
+
+    # Attendance rate change from last month (events 30-60 days ago)
+    prev_registered = agg.get("prevRegistered", 0)
+    prev_attendance_rate = round(
+        (agg.get("prevAttended", 0) / prev_registered) * 100, 1
+    ) if prev_registered else 0.0
+    attendance_rate_change = round(attendance_rate - prev_attendance_rate, 1) if prev_attendance_rate else 0.0
+
+    return {
+        "members": members,
+        "memberGrowth": member_growth,
+        "eventAttendance": event_attendance,
+        "attendanceRate": attendance_rate,
+        "attendanceRateChange": attendance_rate_change,
+        "profileViews": profile_views,
+        "profileGrowth": profile_growth,
+        "freshnessScore": freshness_score,
+        "engagementScore": engagement_score,
+    }
+
+
+def club_metrics_batch(session, club_ids) -> Dict[Any, Dict[str, Any]]:
+    """{club_id: metrics payload} for every existing club in club_ids (four queries total)."""
+    club_ids = list(club_ids)
+    if not club_ids:
+        return {}
+    now = datetime.now(timezone.utc)
+    clubs = session.query(Club).filter(Club.id.in_(club_ids)).all()
+    stats = get_club_stats(session, club_ids)
+    aggregates = event_aggregates(session, club_ids, now)
+    daily = daily_totals(session, club_ids)
+    return {
+        c.id: _metrics_payload(
+            c,
+            stats[c.id].member_count if c.id in stats else 0,
+            aggregates.get(c.id, {}),
+            daily.get(c.id, {}),
+            now,
+        )
+        for c in clubs
+    }
+
+
+def club_metrics(session, club_id) -> Dict[str, Any] | None:
+    """Metrics payload for one club, or None if it does not exist."""
+    return club_metrics_batch(session, [club_id]).get(club_id)
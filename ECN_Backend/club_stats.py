@@ -0,0 +1,254 @@
+# club_stats.py
+"""
+Maintenance of the club_stats summary table.
+
+Writes that change membership, reviews, events or RSVPs apply their change to
+the club's row as a delta (bump_members, bump_reviews, bump_registered,
+event_saved, event_removed) inside their own transaction, so readers only ever
+need a single-row lookup and writers never rescan a club's history. The full
+recompute (refresh_club_stats / rebuild_club_stats) is reserved for the CLI
+repair path and the job that refreshes rows whose next event has passed.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from event_lifecycle import UPCOMING, upcoming_clause
+from models import Club, ClubMembership, ClubStats, Event, EventRsvp, Review
+from rsvps import REGISTERED_STATUSES
+
+
+# ---- full recompute (repair / stale rows) ----
+
+def _stats_select(club_ids, now: datetime):
+    """SELECT producing one club_stats row per club (all clubs when club_ids is None)."""
+
+    def _scope(stmt, col):
+        return stmt.where(col.in_(club_ids)) if club_ids is not None else stmt
+
+    members_sq = _scope(
+        select(ClubMembership.club_id, func.count(ClubMembership.id).label("members")),
+        ClubMembership.club_id,
+    ).group_by(ClubMembership.club_id).subquery()
+    reviews_sq = _scope(
+        select(
+            Review.club_id,
+            func.count(Review.id).label("review_count"),
+            func.sum(Review.rating).label("rating_sum"),
+        ),
+        Review.club_id,
+    ).group_by(Review.club_id).subquery()
+    events_sq = _scope(
+        select(
+            Event.club_id,
+            func.count(Event.id).filter(upcoming_clause(now)).label("upcoming"),
+        ),
+        Event.club_id,
+    ).group_by(Event.club_id).subquery()
+    rsvps_sq = _scope(
+        select(
+            Event.club_id,
+            func.count(EventRsvp.id).filter(EventRsvp.rsvp_status.in_(REGISTERED_STATUSES)).label("registered"),
+            func.count(EventRsvp.id).filter(EventRsvp.attended.is_(True)).label("attended"),
+        ).join(EventRsvp, EventRsvp.event_id == Event.id),
+        Event.club_id,
+    ).group_by(Event.club_id).subquery()
+    # Postgres DISTINCT ON: earliest upcoming event per club
+    next_sq = _scope(
+        select(Event.club_id, Event.id, Event.start_time)
+        .where(upcoming_clause(now))
+        .order_by(Event.club_id, Event.start_time.asc())
+        .distinct(Event.club_id),
+        Event.club_id,
+    ).subquery()
+
+    return _scope(
+        select(
+            Club.id,
+            func.coalesce(members_sq.c.members, 0),
+            func.coalesce(reviews_sq.c.review_count, 0),
+            func.coalesce(reviews_sq.c.rating_sum, 0),
+            func.coalesce(events_sq.c.upcoming, 0),
+            next_sq.c.id,
+            next_sq.c.start_time,
+            func.coalesce(rsvps_sq.c.registered, 0),
+            func.coalesce(rsvps_sq.c.attended, 0),
+            Club.verified,
+            func.now(),
+        )
+        .outerjoin(members_sq, members_sq.c.club_id == Club.id)
+        .outerjoin(reviews_sq, reviews_sq.c.club_id == Club.id)
+        .outerjoin(events_sq, events_sq.c.club_id == Club.id)
+        .outerjoin(rsvps_sq, rsvps_sq.c.club_id == Club.id)
+        .outerjoin(next_sq, next_sq.c.club_id == Club.id),
+        Club.id,
+    )
+
+
+_STAT_COLUMNS = [
+    "club_id",
+    "member_count",
+    "review_count",
+    "rating_sum",
+    "upcoming_event_count",
+    "next_event_id",
+    "next_event_at",
+    "total_registered",
+    "total_attended",
+    "verified",
+    "updated_at",
+]
+
+
+def _upsert(session, club_ids) -> None:
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(ClubStats).from_select(_STAT_COLUMNS, _stats_select(club_ids, now))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClubStats.club_id],
+        set_={c: stmt.excluded[c] for c in _STAT_COLUMNS[1:]},
+    )
+    session.execute(stmt)
+
+
+def refresh_club_stats(session, club_ids) -> None:
+    """
+    Recompute the stats rows for the given clubs in the caller's transaction
+    (seed / CLI paths; request handlers apply deltas instead).
+    """
+    club_ids = [cid for cid in club_ids if cid is not None]
+    if not club_ids:
+        return
+    # SessionLocal runs with autoflush=False; make pending ORM changes visible first
+    session.flush()
+    # Serialize concurrent refreshes of the same club. The recompute below takes
+    # its snapshot after the lock is granted, so it sees every earlier writer's
+    # committed rows instead of overwriting their counts with a stale one.
+    session.execute(
+        select(ClubStats.club_id)
+        .where(ClubStats.club_id.in_(club_ids))
+        .order_by(ClubStats.club_id)
+        .with_for_update()
+    )
+    _upsert(session, club_ids)
+
+
+def refresh_stale_club_stats(session) -> int:
+    """
+    Recompute rows whose next event has already started. The upcoming count and
+    next event only change with the clock when the next event passes; the jobs
+    thread runs this so reads never write. Rows a writer holds locked right now
+    are skipped until the next run; returns how many were refreshed.
+    """
+    # same lock order as refresh_club_stats, so the two cannot deadlock
+    stale = session.execute(
+        select(ClubStats.club_id)
+        .where(ClubStats.next_event_at < func.now())
+        .order_by(ClubStats.club_id)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if stale:
+        _upsert(session, stale)
+    return len(stale)
+
+
+def get_club_stats(session, club_ids) -> dict:
+    """{club_id: ClubStats} for the given clubs."""
+    if not club_ids:
+        return {}
+    rows = session.query(ClubStats).filter(ClubStats.club_id.in_(club_ids)).all()
+    return {r.club_id: r for r in rows}
+
+
+def rebuild_club_stats(session) -> None:
+    """Recompute club_stats for every club (repair / first deploy)."""
+    session.flush()
+    _upsert(session, None)
+
+
+# ---- deltas (write paths) ----
+
+def _bump(session, club_id, **deltas) -> None:
+    """col = col + delta on one club's row; an atomic single-row UPDATE."""
+    values = {col: getattr(ClubStats, col) + d for col, d in deltas.items() if d}
+    if values:
+        session.execute(update(ClubStats).where(ClubStats.club_id == club_id).values(**values))
+
+
+def init_club_stats(session, club_id, verified: bool = False) -> None:
+    """Zeroed row for a new club (nothing to count yet)."""
+    session.execute(
+        pg_insert(ClubStats)
+        .values(club_id=club_id, verified=verified)
+        .on_conflict_do_nothing(index_elements=[ClubStats.club_id])
+    )
+
+
+def bump_members(session, club_id, delta: int) -> None:
+    """Apply a join / leave / kick to member_count."""
+    _bump(session, club_id, member_count=delta)
+
+
+def bump_reviews(session, club_id, count_delta: int, rating_delta: int) -> None:
+    """Apply a new review (1, rating) or a changed one (0, new - old)."""
+    _bump(session, club_id, review_count=count_delta, rating_sum=rating_delta)
+
+
+def bump_registered(session, club_id, delta: int) -> None:
+    """
+    Apply an RSVP count change to club_stats.total_registered without a full
+    recompute; keeps the RSVP hot path to a single-row update.
+    """
+    _bump(session, club_id, total_registered=delta)
+
+
+def is_upcoming(event, now: datetime | None = None) -> bool:
+    """Python twin of event_lifecycle.upcoming_clause for a loaded Event."""
+    now = now or datetime.now(timezone.utc)
+    start = event.start_time
+    if start is not None and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return event.status == UPCOMING and start is not None and start >= now
+
+
+def _event_delta(session, club_id, exclude=None, **deltas) -> None:
+    """
+    Apply count deltas and re-pick the next event in one UPDATE. The pick is a
+    LIMIT 1 over ix_events_club_start for this club only.
+    """
+    now = datetime.now(timezone.utc)
+    pick = select(Event.id).where(Event.club_id == club_id, upcoming_clause(now))
+    if exclude is not None:
+        pick = pick.where(Event.id != exclude)
+    pick = pick.order_by(Event.start_time.asc(), Event.id).limit(1)
+    # Lock the row first: under READ COMMITTED the pick below then takes its
+    # snapshot after any concurrent event write to this club has committed.
+    session.execute(select(ClubStats.club_id).where(ClubStats.club_id == club_id).with_for_update())
+    values = {col: getattr(ClubStats, col) + d for col, d in deltas.items() if d}
+    values["next_event_id"] = pick.scalar_subquery()
+    values["next_event_at"] = pick.with_only_columns(Event.start_time).scalar_subquery()
+    session.execute(update(ClubStats).where(ClubStats.club_id == club_id).values(**values))
+
+
+def event_saved(session, event, was_upcoming: bool = False) -> None:
+    """Apply a created or edited event; was_upcoming is is_upcoming() before the edit."""
+    # SessionLocal runs with autoflush=False; the next-event pick must see the row
+    session.flush()
+    delta = int(is_upcoming(event)) - int(was_upcoming)
+    _event_delta(session, event.club_id, upcoming_event_count=delta)
+
+
+def event_removed(session, event) -> None:
+    """Take an event's counts out of its club's row; call before deleting it."""
+    session.flush()
+    attended = session.execute(
+        select(func.count(EventRsvp.id)).where(EventRsvp.event_id == event.id, EventRsvp.attended.is_(True))
+    ).scalar_one()
+    _event_delta(
+        session, event.club_id, exclude=event.id,
+        upcoming_event_count=-int(is_upcoming(event)),
+        total_registered=-(event.rsvp_count or 0),
+        total_attended=-attended,
+    )
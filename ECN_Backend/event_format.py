@@ -0,0 +1,63 @@
+# event_format.py
+"""
+Display formatting for event times, shared by every route that shows events.
+
+Times are stored as UTC timestamptz and shown in campus time. The ZoneInfo is
+built once, and formatted strings are memoized per minute: a page of events
+mostly repeats a handful of slots ("7:00 PM", "Oct 21"), so formatting 10k
+rows costs a dict lookup each instead of a tz conversion plus two strftime
+calls.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+CAMPUS_TZ = ZoneInfo("America/New_York")
+
+DATE_FORMAT = "%b %d"      # "Oct 21"
+TIME_FORMAT = "%-I:%M %p"  # "7:00 PM"
+
+
+def _utc(dt: datetime) -> datetime:
+    # naive values are UTC by convention (datetime.utcnow() callers)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+@lru_cache(maxsize=8192)
+def _display_minute(minute: int) -> Tuple[str, str]:
+    local = datetime.fromtimestamp(minute * 60, CAMPUS_TZ)
+    return local.strftime(DATE_FORMAT), local.strftime(TIME_FORMAT)
+
+
+def display_datetime(dt: Optional[datetime]) -> Tuple[Optional[str], Optional[str]]:
+    """("Oct 21", "7:00 PM") in campus time, or (None, None)."""
+    if dt is None:
+        return None, None
+    return _display_minute(int(_utc(dt).timestamp()) // 60)
+
+
+def display_date(dt: Optional[datetime]) -> Optional[str]:
+    return display_datetime(dt)[0]
+
+
+def display_time(dt: Optional[datetime]) -> Optional[str]:
+    return display_datetime(dt)[1]
+
+
+def display_many(dts: Iterable[Optional[datetime]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """display_datetime for a batch of values, in order."""
+    return [display_datetime(dt) for dt in dts]
+
+
+def next_event_summary(evt) -> dict:
+    """Compact next-event card used in club listings."""
+    date_str, time_str = display_datetime(evt.start_time)
+    return {
+        "name": evt.title,
+        "date": date_str,
+        "time": time_str,
+        "location": evt.location or "TBD",
+    }
@@ -0,0 +1,50 @@
+# event_lifecycle.py
+"""
+Event status lifecycle: upcoming -> past.
+
+Writes set the status from start_time (status_for) and a background job moves
+events that have since started to 'past' with one UPDATE over the
+ix_events_upcoming_start partial index. Readers filter upcoming events with
+upcoming_clause(now), which keeps the start_time check so results are exact
+even between job runs, and label events by status instead of comparing times.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, update
+
+from models import Event
+
+UPCOMING = "upcoming"
+PAST = "past"
+CANCELLED = "cancelled"
+
+
+def upcoming_clause(now: datetime, cols=Event):
+    """Events still to come (not cancelled); cols may be an aliased subquery's .c."""
+    return and_(cols.status == UPCOMING, cols.start_time >= now)
+
+
+def status_for(start_time: datetime | None, current: str | None = None) -> str:
+    """Status an event should have given its start time; cancelled stays cancelled."""
+    if current == CANCELLED:
+        return CANCELLED
+    if start_time is None:
+        return current or UPCOMING
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    return UPCOMING if start_time >= datetime.now(timezone.utc) else PAST
+
+
+def advance_event_statuses(session, now: datetime | None = None) -> int:
+    """Mark every started 'upcoming' event 'past' in one UPDATE; returns rows changed."""
+    now = now or datetime.now(timezone.utc)
+    result = session.execute(
+        update(Event)
+        .where(Event.status == UPCOMING, Event.start_time < now)
+        # a status flip is not an edit; keep updated_at (activity feeds sort on it)
+        .values(status=PAST, updated_at=Event.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
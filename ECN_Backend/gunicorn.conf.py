@@ -0,0 +1,55 @@
+# gunicorn.conf.py
+"""
+gunicorn settings for the ECN API (gunicorn -c gunicorn.conf.py wsgi:app).
+
+Process / thread layout comes from the environment:
+  ECN_BIND              address to listen on (default 0.0.0.0:$PORT or :5000)
+  ECN_WORKERS           worker processes (default 2 x CPUs + 1)
+  ECN_THREADS           threads per worker; > 1 switches to the gthread worker (default 4)
+  ECN_TIMEOUT           seconds before a silent worker is killed (default 30)
+  ECN_GRACEFUL_TIMEOUT  seconds in-flight requests get to finish on shutdown/reload (default 30)
+  ECN_MAX_REQUESTS      recycle a worker after this many requests, 0 = never (default 0)
+
+Each worker holds its own SQLAlchemy pool (ECN_DB_POOL_SIZE + ECN_DB_MAX_OVERFLOW),
+so keep workers x pool within Postgres max_connections, and the pool at least
+as large as ECN_THREADS so threads do not queue for connections.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("ECN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("ECN_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv("ECN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.getenv("ECN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("ECN_GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.getenv("ECN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+# Import the app once in the master so workers fork with code already loaded
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (none normally, but create_app may touch
+    # the engine) must not be shared across processes: drop them without
+    # closing the parent's sockets and let each worker open its own.
+    from db_ops import engine
+    engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Warm in the worker, not the master: post_fork discards inherited connections
+    from db_ops import start_pool_warmup
+    from jobs import start_background_jobs
+    start_pool_warmup()
+    start_background_jobs()
+
+
+def worker_exit(server, worker):
+    # Runs after in-flight requests drained (graceful_timeout); flush buffers
+    from jobs import shutdown_background_jobs
+    shutdown_background_jobs()
@@ -0,0 +1,99 @@
+# http_cache.py
+"""
+ETag / Last-Modified support for read-heavy GET routes.
+
+@conditional(version_fn) asks version_fn for a cheap version of the data a
+route depends on before running it. If the client already holds that version
+(If-None-Match / If-Modified-Since) the route body is skipped and a 304 is
+returned; otherwise the response is stamped with ETag, Last-Modified and the
+route's Cache-Control policy.
+
+Versions are derived from club_stats.updated_at, which every write touching a
+club already bumps (see the club_stats delta helpers), plus
+clubs.updated_at and a flag for rows whose next event has started.
+"""
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+
+from flask import g, make_response, request
+from sqlalchemy import func, select
+
+from db_ops import get_session
+from models import Club, ClubStats
+
+
+def all_clubs_version(session, **_):
+    """Version of every club listing (clubs, their stats and their events)."""
+    row = session.execute(
+        select(
+            select(func.max(ClubStats.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(ClubStats).scalar_subquery(),
+            select(func.max(Club.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(ClubStats)
+            .where(ClubStats.next_event_at < func.now()).scalar_subquery(),
+        )
+    ).one()
+    stats_at, n_clubs, clubs_at, stale = row
+    return max(filter(None, (stats_at, clubs_at)), default=None), (stats_at, n_clubs, clubs_at, stale)
+
+
+def club_version(session, club_id, **_):
+    """Version of one club's profile / events; None if the club does not exist."""
+    row = session.execute(
+        select(Club.updated_at, ClubStats.updated_at, ClubStats.next_event_at < func.now())
+        .outerjoin(ClubStats, ClubStats.club_id == Club.id)
+        .where(Club.id == club_id)
+    ).first()
+    if row is None:
+        return None
+    clubs_at, stats_at, stale = row
+    return max(filter(None, (stats_at, clubs_at)), default=None), tuple(row)
+
+
+def _etag(key) -> str:
+    raw = repr((request.path, sorted(request.args.items(multi=True)), key))
+    return hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+def _not_modified(tag: str, last_modified) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(tag)
+    since = request.if_modified_since
+    return bool(since and last_modified and last_modified.replace(microsecond=0) <= since)
+
+
+def conditional(version_fn, cache_control: str = "no-cache", on_request=None):
+    """
+    Decorator for GET views. version_fn(session, **view_kwargs) returns
+    (last_modified, key) or None to skip conditional handling (e.g. not found).
+    on_request(**view_kwargs), if given, runs for every request that has a
+    version, including ones answered with 304.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with get_session() as s:
+                version = version_fn(s, **kwargs)
+            if version is None:
+                return view(*args, **kwargs)
+            if on_request is not None:
+                on_request(**kwargs)
+
+            last_modified, key = version
+            g.cache_version = key  # lets response_cache key bodies by data version
+            tag = _etag(key)
+            if _not_modified(tag, last_modified):
+                resp = make_response("", 304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(tag, weak=True)
+            if last_modified is not None:
+                resp.last_modified = last_modified
+            resp.headers["Cache-Control"] = cache_control
+            return resp
+        return wrapper
+    return decorator
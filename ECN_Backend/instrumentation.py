@@ -0,0 +1,150 @@
+# instrumentation.py
+"""
+Per-request SQL accounting, Server-Timing and slow-request logging.
+
+install_sql_hooks(engine) times every statement with before/after_cursor_execute
+and, inside a Flask request, adds it to that request's totals (statement count,
+DB time, slowest statements). init_app(app) opens the totals per request and,
+after the view, sets a Server-Timing header and writes one structured log line
+to the "ecn.requests" logger. Requests over their statement or latency budget
+are logged at WARNING with the budgets they broke; single statements slower
+than ECN_SLOW_QUERY_MS are logged to "ecn.sql" wherever they run.
+
+Settings: ECN_SQL_INSTRUMENT (on/off), ECN_SLOW_QUERY_MS, ECN_REQUEST_BUDGET_MS,
+ECN_REQUEST_STATEMENT_BUDGET, ECN_LOG_LEVEL. A route can override the budgets
+with @sql_budget(statements=..., ms=...).
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+_ENABLED = os.getenv("ECN_SQL_INSTRUMENT", "true").lower() == "true"
+_SLOW_QUERY_MS = float(os.getenv("ECN_SLOW_QUERY_MS", "100"))
+_BUDGET_MS = float(os.getenv("ECN_REQUEST_BUDGET_MS", "500"))
+_BUDGET_STATEMENTS = int(os.getenv("ECN_REQUEST_STATEMENT_BUDGET", "25"))
+_TOP_N = 3
+_SQL_PREVIEW = 200
+_hooked: set[int] = set()
+
+request_log = logging.getLogger("ecn.requests")
+sql_log = logging.getLogger("ecn.sql")
+
+
+def configure_logging() -> None:
+    """Root logging for the server process; a no-op if something configured it first."""
+    logging.basicConfig(
+        level=os.getenv("ECN_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+
+
+def _preview(statement: str) -> str:
+    return " ".join(statement.split())[:_SQL_PREVIEW]
+
+
+def install_sql_hooks(engine) -> None:
+    if not _ENABLED or id(engine) in _hooked:
+        return
+    _hooked.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("ecn_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        ms = (time.perf_counter() - conn.info["ecn_t0"].pop()) * 1000
+        if ms >= _SLOW_QUERY_MS:
+            sql_log.warning("slow statement %.1fms: %s", ms, _preview(statement))
+        if not has_request_context():
+            return
+        stats = g.get("sql_stats")
+        if stats is None:
+            return
+        stats["statements"] += 1
+        stats["ms"] += ms
+        slowest = stats["slowest"]
+        entry = (ms, stats["statements"], statement)
+        if len(slowest) < _TOP_N:
+            heapq.heappush(slowest, entry)
+        elif ms > slowest[0][0]:
+            heapq.heapreplace(slowest, entry)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # keep the timing stack balanced when a statement fails
+        conn = context.connection
+        if conn is not None and conn.info.get("ecn_t0"):
+            conn.info["ecn_t0"].pop()
+
+
+def sql_budget(statements: int | None = None, ms: float | None = None):
+    """Per-route budget override, e.g. @sql_budget(statements=40) on a dashboard view."""
+    def decorator(view):
+        view.sql_budget = {"statements": statements, "ms": ms}
+        return view
+    return decorator
+
+
+def _budget_for(app) -> tuple[int, float]:
+    view = app.view_functions.get(request.endpoint) if request.endpoint else None
+    override = getattr(view, "sql_budget", {}) if view is not None else {}
+    return (
+        override.get("statements") or _BUDGET_STATEMENTS,
+        override.get("ms") or _BUDGET_MS,
+    )
+
+
+def init_app(app) -> None:
+    if not _ENABLED:
+        return
+
+    @app.before_request
+    def _start():
+        g.request_t0 = time.perf_counter()
+        g.sql_stats = {"statements": 0, "ms": 0.0, "slowest": []}
+
+    @app.after_request
+    def _finish(response):
+        stats = g.get("sql_stats")
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - g.request_t0) * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats["ms"]:.1f};desc="{stats["statements"]} statements", app;dur={total_ms:.1f}',
+        )
+
+        max_statements, max_ms = _budget_for(app)
+        over = []
+        if stats["statements"] > max_statements:
+            over.append(f"statements>{max_statements}")
+        if total_ms > max_ms:
+            over.append(f"ms>{max_ms:g}")
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "ms": round(total_ms, 1),
+            "dbMs": round(stats["ms"], 1),
+            "statements": stats["statements"],
+        }
+        if over:
+            record["overBudget"] = over
+            record["slowest"] = [
+                {"ms": round(ms, 1), "n": n, "sql": _preview(sql)}
+                for ms, n, sql in sorted(stats["slowest"], reverse=True)
+            ]
+            request_log.warning(json.dumps(record))
+        else:
+            request_log.info(json.dumps(record))
+        return response
@@ -0,0 +1,116 @@
+# jobs.py
+"""
+Periodic background jobs for a server process.
+
+A single daemon thread runs every registered job on its own interval. Jobs
+open their own sessions and must be safe to run concurrently from several
+worker processes. Started by app.create_app() (under gunicorn, once per
+worker after fork); buffered work is flushed once more when the worker exits.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+from db_ops import get_session
+from analytics import compact_activity, flush_views
+from club_stats import refresh_stale_club_stats
+from event_lifecycle import advance_event_statuses
+
+_VIEW_FLUSH_SEC = float(os.getenv("ECN_VIEW_FLUSH_SEC", "10"))
+_ACTIVITY_COMPACT_SEC = float(os.getenv("ECN_ACTIVITY_COMPACT_SEC", "60"))
+_EVENT_STATUS_SEC = float(os.getenv("ECN_EVENT_STATUS_SEC", "60"))
+_CLUB_STATS_SEC = float(os.getenv("ECN_CLUB_STATS_SEC", "60"))
+
+log = logging.getLogger(__name__)
+
+_jobs: list[dict] = []
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def register_job(name: str, interval_sec: float, fn: Callable[[], object]) -> None:
+    """Run fn() every interval_sec seconds on the background thread."""
+    with _lock:
+        _jobs.append({"name": name, "interval": interval_sec, "fn": fn, "next": time.monotonic() + interval_sec})
+
+
+def _run(job: dict) -> None:
+    try:
+        job["fn"]()
+    except Exception:
+        log.exception("job %s failed", job["name"])
+
+
+def _loop() -> None:
+    while not _stop.is_set():
+        now = time.monotonic()
+        with _lock:
+            due = [j for j in _jobs if j["next"] <= now]
+            for j in due:
+                j["next"] = now + j["interval"]
+        for j in due:
+            _run(j)
+        _stop.wait(1.0)
+
+
+def start_background_jobs() -> None:
+    """Start the job thread once per process."""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, name="ecn-jobs", daemon=True)
+        _thread.start()
+
+
+def stop_background_jobs() -> None:
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+
+
+# ---- Built-in jobs ----
+def flush_view_buffer() -> int:
+    with get_session() as s:
+        return flush_views(s)
+
+
+def compact_activity_log() -> int:
+    with get_session() as s:
+        return compact_activity(s)
+
+
+def advance_event_status() -> int:
+    with get_session() as s:
+        return advance_event_statuses(s)
+
+
+def refresh_stale_stats() -> int:
+    with get_session() as s:
+        return refresh_stale_club_stats(s)
+
+
+register_job("flush_views", _VIEW_FLUSH_SEC, flush_view_buffer)
+register_job("compact_activity", _ACTIVITY_COMPACT_SEC, compact_activity_log)
+register_job("advance_event_status", _EVENT_STATUS_SEC, advance_event_status)
+register_job("refresh_stale_club_stats", _CLUB_STATS_SEC, refresh_stale_stats)
+
+
+_drained = threading.Event()
+
+
+@atexit.register
+def shutdown_background_jobs() -> None:
+    """Stop the job thread and flush buffered view counts; safe to call more than once."""
+    if _drained.is_set():
+        return
+    _drained.set()
+    stop_background_jobs()
+    _run({"name": "flush_views", "fn": flush_view_buffer})
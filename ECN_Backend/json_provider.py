@@ -0,0 +1,58 @@
+# json_provider.py
+"""
+Flask JSON provider backed by orjson (pinned in requirements.txt).
+
+install_json_provider(app) swaps app.json for OrjsonProvider unless
+ECN_FAST_JSON=false or orjson is missing from the environment (logged as a
+warning, since requirements.txt installs it); then Flask's stdlib provider stays. The
+output matches the default provider's: keys sorted, datetimes as HTTP dates,
+UUIDs / Decimals / dataclasses via the same default() hook.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import typing as t
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, e.g. a venv that predates the pin
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+_ENABLED = os.getenv("ECN_FAST_JSON", "true").lower() == "true"
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    _NATIVE_KWARGS = {"sort_keys", "indent", "separators", "ensure_ascii"}
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        if not kwargs.keys() <= self._NATIVE_KWARGS:
+            # stdlib-only options (cls=, allow_nan=, ...)
+            return super().dumps(obj, **kwargs)
+        # datetimes go through default() so they serialize like the stdlib provider
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: t.Any) -> t.Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def install_json_provider(app) -> str:
+    """Use orjson for app.json unless disabled; returns the provider name in use."""
+    if not _ENABLED:
+        return "stdlib"
+    if orjson is None:
+        log.warning("orjson is not installed; serving JSON with the stdlib encoder (pip install -r requirements.txt)")
+        return "stdlib"
+    app.json = OrjsonProvider(app)
+    return "orjson"
@@ -0,0 +1,83 @@
+# memberships.py
+"""
+Club membership lookups and writes against the club_memberships table.
+
+Every check here is an index lookup on (club_id, student_id) or student_id,
+replacing the `x in club.member_ids` scans and whole-array rewrites.
+"""
+from __future__ import annotations
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from analytics import record_activity
+from models import ClubMembership, OfficerRole
+
+
+def student_club_ids(session, student_id) -> list:
+    """Ids of every club the student belongs to (members, officers and presidents)."""
+    return list(session.scalars(
+        select(ClubMembership.club_id).where(ClubMembership.student_id == student_id)
+    ))
+
+
+def is_member(session, club_id, student_id) -> bool:
+    return bool(session.scalar(
+        select(exists().where(
+            ClubMembership.club_id == club_id,
+            ClubMembership.student_id == student_id,
+        ))
+    ))
+
+
+def has_role(session, club_id, student_id, roles) -> bool:
+    """True if the student holds any of `roles` in OfficerRole for the club."""
+    return bool(session.scalar(
+        select(exists().where(
+            OfficerRole.club_id == club_id,
+            OfficerRole.student_id == student_id,
+            OfficerRole.role.in_(list(roles)),
+        ))
+    ))
+
+
+def add_member(session, club_id, student_id) -> bool:
+    """Insert the membership row; returns False if the student was already a member."""
+    stmt = (
+        pg_insert(ClubMembership)
+        .values(club_id=club_id, student_id=student_id)
+        .on_conflict_do_nothing(index_elements=[ClubMembership.club_id, ClubMembership.student_id])
+        .returning(ClubMembership.id)
+    )
+    added = session.execute(stmt).first() is not None
+    if added:
+        record_activity(session, club_id, "join", student_id)
+    return added
+
+
+def remove_member(session, club_id, student_id) -> bool:
+    """Delete the membership row and any officer roles; returns False if not a member."""
+    session.execute(
+        delete(OfficerRole).where(
+            OfficerRole.club_id == club_id,
+            OfficerRole.student_id == student_id,
+        )
+    )
+    stmt = (
+        delete(ClubMembership)
+        .where(
+            ClubMembership.club_id == club_id,
+            ClubMembership.student_id == student_id,
+        )
+        .returning(ClubMembership.id)
+    )
+    removed = session.execute(stmt).first() is not None
+    if removed:
+        record_activity(session, club_id, "leave", student_id)
+    return removed
+
+
+def club_member_count(session, club_id) -> int:
+    return session.scalar(
+        select(func.count(ClubMembership.id)).where(ClubMembership.club_id == club_id)
+    ) or 0
@@ -1,15 +1,16 @@
 # Before deploying this file, make sure to go the main function below and ensuring the credentials are linked to your local or global db
 # ecn_models.py
 from __future__ import annotations
-from datetime import datetime
+from datetime import date, datetime
 import uuid
 
 from sqlalchemy import (
-    Boolean, CheckConstraint, Enum, ForeignKey, Integer, String, Text,
+    BigInteger, Boolean, CheckConstraint, Computed, Date, Enum, ForeignKey, Index, Integer, Numeric,
+    String, Text,
     UniqueConstraint, TIMESTAMP, func, text, create_engine
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
 
 
 # ---------------- Base ----------------
@@ -27,7 +28,15 @@ EventStatus = Enum("upcoming", "past", "cancelled", name="event_status")
 ReviewStatus = Enum("pending", "approved", "rejected", name="review_status")
 ModerationAction = Enum("approve", "reject", "edit", name="moderation_action")
 OfficerRoleEnum = Enum("president", "managing_exec", "officer", name="officer_role")
-RsvpStatus = Enum("going", "not_going", "interested", name="rsvp_status")
+RsvpStatus = Enum("going", "not_going", "interested", "waitlisted", name="rsvp_status")
+
+
+# Weighted full-text document for clubs: name (A) ranks above description/purpose (B).
+# Shared with db_ops.ensure_search_schema, which adds the column to existing databases.
+CLUB_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '') || ' ' || coalesce(purpose, '')), 'B')"
+)
 
 
 # ---------------- Tables ----------------
@@ -43,7 +52,8 @@ class Student(Base):
     password_hash: Mapped[str | None] = mapped_column(String)
     is_verified: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text("false"))
 
-    # Arrays default to empty
+    # Arrays default to empty. my_clubs / officer_clubs / attended_events / rsvped_events
+    # are legacy: membership lives in club_memberships and RSVPs in event_rsvps.
     my_clubs: Mapped[list[uuid.UUID]] = mapped_column(
         ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'")
     )
@@ -70,6 +80,16 @@ class Student(Base):
 
 class Club(Base):
     __tablename__ = "clubs"
+    __table_args__ = (
+        # "updated" sort on /api/clubs (updated_at DESC, id DESC) scans this backwards
+        Index("ix_clubs_updated_id", "updated_at", "id"),
+        # Postgres search engine (ECN_SEARCH_ENGINE=postgres); trigram index needs pg_trgm
+        Index("ix_clubs_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_clubs_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=pk_uuid)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -86,6 +106,7 @@ class Club(Base):
     update_recency_badge: Mapped[str | None] = mapped_column(String)
     org_chart_schema: Mapped[str | None] = mapped_column(String)
     
+    # Legacy membership arrays; club_memberships + OfficerRole are the source of truth
     officers: Mapped[list[uuid.UUID]] = mapped_column(
         ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'")
     )
@@ -106,6 +127,10 @@ class Club(Base):
     contact_phone: Mapped[str | None] = mapped_column(String)
     request_info_form_url: Mapped[str | None] = mapped_column(String)
 
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(CLUB_SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
     )
@@ -119,6 +144,14 @@ class Club(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Per-club event timelines (next / recent events, top-N per club)
+        Index("ix_events_club_start", "club_id", "start_time"),
+        # Campus-wide feed: date-range scans and (start_time, id) keyset pages
+        Index("ix_events_start", "start_time", "id"),
+        # Upcoming feeds / status job; shrinks as events move to 'past'
+        Index("ix_events_upcoming_start", "start_time", "id", postgresql_where=text("status = 'upcoming'")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=pk_uuid)
     club_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False)
@@ -133,7 +166,10 @@ class Event(Base):
     status: Mapped[str] = mapped_column(EventStatus, nullable=False, server_default=text("'upcoming'"))
     media_urls: Mapped[list[str] | None] = mapped_column(ARRAY(String))
     rsvp_limit: Mapped[int | None] = mapped_column(Integer)
+    # Confirmed RSVPs (never above rsvp_limit); maintained with atomic updates in rsvps.py
+    rsvp_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
 
+    # Legacy RSVP arrays; event_rsvps is the source of truth
     rsvp_ids: Mapped[list[uuid.UUID]] = mapped_column(
         ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'")
     )
@@ -212,9 +248,16 @@ class ClubUpdateHistory(Base):
 
 
 class EventRsvp(Base):
+    """Source of truth for RSVPs and attendance (Event.rsvp_ids / attendee_ids are legacy)."""
     __tablename__ = "event_rsvps"
     __table_args__ = (
         UniqueConstraint("event_id", "student_id", name="uq_event_rsvps_event_student"),
+        Index("ix_event_rsvps_student", "student_id"),
+        # Waitlist order for promotion when a seat frees up
+        Index(
+            "ix_event_rsvps_waitlist", "event_id", "rsvp_time",
+            postgresql_where=text("rsvp_status = 'waitlisted'"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=pk_uuid)
@@ -227,6 +270,27 @@ class EventRsvp(Base):
     attendance_time: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
 
 
+class ClubMembership(Base):
+    """
+    One row per (club, student). Source of truth for membership: officers and
+    presidents always have a row here too, their role lives in OfficerRole.
+    Replaces Club.member_ids / officers / president_ids and Student.my_clubs /
+    officer_clubs, which are kept only so db_ops migrate_memberships can backfill.
+    """
+    __tablename__ = "club_memberships"
+    __table_args__ = (
+        UniqueConstraint("club_id", "student_id", name="uq_club_memberships_club_student"),
+        Index("ix_club_memberships_student", "student_id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=pk_uuid)
+    club_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False)
+    student_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
+    joined_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class ReviewModeration(Base):
     __tablename__ = "review_moderation"
 
@@ -241,6 +305,106 @@ class ReviewModeration(Base):
     )
 
 
+class ClubStats(Base):
+    """
+    Denormalized per-club counters read by /api/clubs, metrics and my-clubs.
+    Writes apply deltas through club_stats (bump_members, event_saved, ...);
+    `python db_ops.py rebuild_stats` recomputes the whole table.
+    """
+    __tablename__ = "club_stats"
+    __table_args__ = (
+        Index("ix_club_stats_updated_at", "updated_at"),  # HTTP cache versions
+        Index("ix_club_stats_next_event_at", "next_event_at"),
+    )
+
+    club_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    member_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    upcoming_event_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    next_event_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("events.id", ondelete="SET NULL"))
+    next_event_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    total_registered: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    total_attended: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    verified: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=text("false"))
+
+    # Derived ranking columns; avg_rating defaults to 4.6 for clubs without reviews
+    avg_rating: Mapped[float] = mapped_column(
+        Numeric(2, 1, asdecimal=False),
+        Computed("CASE WHEN review_count > 0 THEN round(rating_sum::numeric / review_count, 1) ELSE 4.6 END"),
+    )
+    activity_score: Mapped[int] = mapped_column(
+        Integer,
+        Computed("least(100, least(100, upcoming_event_count * 8) + CASE WHEN verified THEN 10 ELSE 0 END)"),
+    )
+    discoverability_index: Mapped[int] = mapped_column(
+        Integer,
+        Computed(
+            "least(100, least(100, least(100, upcoming_event_count * 8) + CASE WHEN verified THEN 10 ELSE 0 END)"
+            " + least(40, member_count / 5))"
+        ),
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+# One index per metric sort on /api/clubs, in the exact ORDER BY of
+# services._ranking_keys (metric DESC, club_id), so pages need no sort step
+for _name, _metric in (
+    ("discoverability", ClubStats.discoverability_index),
+    ("activity", ClubStats.activity_score),
+    ("avg_rating", ClubStats.avg_rating),
+    ("member_count", ClubStats.member_count),
+):
+    Index(f"ix_club_stats_rank_{_name}", _metric.desc(), ClubStats.club_id)
+del _name, _metric
+
+
+ActivityKind = Enum("view", "join", "leave", "rsvp", "attend", name="activity_kind")
+
+
+class ActivityEvent(Base):
+    """
+    Append-only activity log. Rows are short-lived: analytics.compact_activity
+    folds them into club_daily_stats and deletes them. `count` lets buffered
+    profile views land as one row per club per flush.
+    """
+    __tablename__ = "activity_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # No FK: keeps log inserts cheap; compaction drops rows for deleted clubs
+    club_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    student_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    kind: Mapped[str] = mapped_column(ActivityKind, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("1"))
+    occurred_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ClubDailyStats(Base):
+    """Per-club, per-day (UTC) rollup of activity_events read by the metrics endpoints."""
+    __tablename__ = "club_daily_stats"
+    __table_args__ = (
+        Index("ix_club_daily_stats_day", "day"),
+    )
+
+    club_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    views: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    joins: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    leaves: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    rsvps: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    attendances: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+
+
 # ---------------- Create-all helper for local dev env----------------
 if __name__ == "__main__":
     # Adjust DSN to your local or global environment for deployment
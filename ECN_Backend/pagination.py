@@ -0,0 +1,124 @@
+# pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is ordered by a fixed list of sort keys ending in a unique id. The
+cursor handed to the client is an opaque token holding the sort-key values of
+the last row it received; the next page filters to rows strictly after that
+row (keyset_after) instead of skipping OFFSET rows, so every page costs the
+same no matter how deep the client has scrolled.
+
+Tokens are bound to the ordering they were issued for: reusing one with a
+different sort raises InvalidCursor.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, false, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class SortKey(NamedTuple):
+    column: Any                 # column or SQL expression
+    descending: bool = False
+    nullable: bool = False      # NULLs sort last (nulls_last) when True
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {"d": value.isoformat()}
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if "d" in value:
+            return datetime.fromisoformat(value["d"])
+        if "u" in value:
+            return uuid.UUID(value["u"])
+    return value
+
+
+def encode_cursor(ordering: str, values: Sequence[Any]) -> str:
+    raw = json.dumps({"o": ordering, "k": [_dump(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, ordering: str, n_keys: int) -> List[Any]:
+    """Sort-key values stored in token; InvalidCursor if malformed or issued for another ordering."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values = [_load(v) for v in data["k"]]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("malformed cursor")
+    if data.get("o") != ordering or len(values) != n_keys:
+        raise InvalidCursor("cursor does not match this ordering")
+    return values
+
+
+def order_clauses(keys: Sequence[SortKey]) -> list:
+    clauses = []
+    for k in keys:
+        clause = k.column.desc() if k.descending else k.column.asc()
+        clauses.append(clause.nulls_last() if k.nullable else clause)
+    return clauses
+
+
+def keyset_after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """
+    WHERE clause selecting rows that sort strictly after `values` under
+    order_clauses(keys):  k1 > v1 OR (k1 = v1 AND k2 > v2) OR ...
+    """
+    branches, ties = [], []
+    for k, v in zip(keys, values):
+        if v is None:
+            # nulls sort last: nothing comes after NULL on this key
+            after, equal = None, k.column.is_(None)
+        else:
+            after = k.column < v if k.descending else k.column > v
+            if k.nullable:
+                after = or_(after, k.column.is_(None))
+            equal = k.column == v
+        if after is not None:
+            branches.append(and_(*ties, after))
+        ties.append(equal)
+    return or_(*branches) if branches else false()
+
+
+def page_size(raw: Optional[str], default: int = DEFAULT_PAGE_SIZE) -> int:
+    try:
+        size = int(raw) if raw is not None else default
+    except ValueError:
+        size = default
+    return max(1, min(MAX_PAGE_SIZE, size))
+
+
+def paginate(query, keys: Sequence[SortKey], ordering: str, limit: int,
+             after: Optional[str] = None, key_of=None):
+    """
+    Run one keyset page of a Query: (rows, next_cursor). key_of(row) returns
+    the row's sort-key values (defaults to the trailing columns of the row,
+    one per key). next_cursor is None on the last page.
+    """
+    if after:
+        query = query.filter(keyset_after(keys, decode_cursor(after, ordering, len(keys))))
+    rows = query.order_by(*order_clauses(keys)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = key_of(rows[-1]) if key_of else tuple(rows[-1])[-len(keys):]
+    return rows, encode_cursor(ordering, last)
@@ -0,0 +1,126 @@
+# response_cache.py
+"""
+In-process response cache for api_bp read routes.
+
+@cached(tags) stores the body of successful GET responses in a bounded,
+byte-accounted TTLCache keyed on route path + normalized query args. Write
+routes call invalidate_club(club_id) after committing, which drops every
+cached response tagged with that club plus the cross-club listings.
+
+Each worker process has its own cache. When the route is also wrapped in
+http_cache.conditional, the data version it computed is part of the key, so
+a write handled by another worker changes the key here too and stale bodies
+are never served; the TTL bounds staleness for routes without a version.
+
+Settings: ECN_RESPONSE_CACHE (on/off), ECN_RESPONSE_CACHE_SIZE (entries),
+ECN_RESPONSE_CACHE_MB (body bytes), ECN_RESPONSE_CACHE_TTL (seconds).
+"""
+from __future__ import annotations
+
+import os
+import threading
+from functools import wraps
+
+from flask import Response, g, make_response, request
+
+from cache import TTLCache
+
+_ENABLED = os.getenv("ECN_RESPONSE_CACHE", "true").lower() == "true"
+
+_CACHE = TTLCache(
+    maxsize=int(os.getenv("ECN_RESPONSE_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("ECN_RESPONSE_CACHE_TTL", "30")),
+    max_bytes=int(float(os.getenv("ECN_RESPONSE_CACHE_MB", "64")) * 1024 * 1024),
+    weigh=lambda entry: len(entry[0]),
+)
+
+# Headers worth replaying on a hit; ETag / Cache-Control are set by http_cache
+_KEEP_HEADERS = ("Content-Type",)
+
+# Tag for the cross-club listings (/api/clubs, /api/events)
+ALL_CLUBS = "clubs"
+
+_tag_keys: dict[str, set] = {}
+_MAX_KEYS_PER_TAG = 256
+_tag_lock = threading.Lock()
+_invalidations = 0
+
+
+def club_tag(club_id) -> str:
+    return f"club:{club_id}"
+
+
+def _cache_key():
+    args = tuple(sorted(request.args.items(multi=True)))
+    return (request.path, args, g.get("cache_version"))
+
+
+def cached(tags):
+    """
+    Decorator for GET views. tags(**view_kwargs) returns the invalidation
+    tags for the response, e.g. lambda club_id: [club_tag(club_id)].
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED or request.method != "GET":
+                return view(*args, **kwargs)
+
+            key = _cache_key()
+            hit = _CACHE.get(key)
+            if hit is not None:
+                body, headers = hit
+                resp = Response(body, status=200, headers=headers)
+                resp.headers["X-Cache"] = "HIT"
+                return resp
+
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200 and not resp.direct_passthrough:
+                headers = [(h, resp.headers[h]) for h in _KEEP_HEADERS if h in resp.headers]
+                _CACHE.set(key, (resp.get_data(), headers))
+                with _tag_lock:
+                    for tag in tags(**kwargs):
+                        keys = _tag_keys.setdefault(tag, set())
+                        keys.add(key)
+                        if len(keys) > _MAX_KEYS_PER_TAG:
+                            # forget keys the LRU already evicted
+                            _tag_keys[tag] = {k for k in keys if k in _CACHE}
+            resp.headers["X-Cache"] = "MISS"
+            return resp
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags) -> None:
+    """Drop every cached response carrying any of the tags."""
+    global _invalidations
+    with _tag_lock:
+        keys = set()
+        for tag in tags:
+            keys |= _tag_keys.pop(tag, set())
+        _invalidations += 1
+    for key in keys:
+        _CACHE.pop(key)
+
+
+def invalidate_club(club_id=None) -> None:
+    """Call after a write that changes a club, its members or its events."""
+    if club_id is None:
+        invalidate(ALL_CLUBS)
+    else:
+        invalidate(ALL_CLUBS, club_tag(club_id))
+
+
+def cache_stats() -> dict:
+    stats = _CACHE.stats()
+    lookups = stats["hits"] + stats["misses"]
+    with _tag_lock:
+        tags = len(_tag_keys)
+    stats.update({
+        "enabled": _ENABLED,
+        "ttlSec": _CACHE.ttl,
+        "hitRate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "invalidations": _invalidations,
+        "tags": tags,
+    })
+    return stats
@@ -1,15 +1,27 @@
 from flask import Blueprint, request, jsonify, make_response, redirect
-from services import list_clubs, create_club, list_events, create_event, search_clubs_smart, auth_register, auth_login, auth_me, auth_cookie_name
+from services import list_clubs, create_club, list_events, list_events_page, EVENT_PAGE_KEYS, create_event, search_clubs_smart, index_club, auth_register, auth_login, auth_me, auth_cookie_name
+import logging
 import os
-from db_ops import get_session
-from models import Club, Event, OfficerRole, Student, Review
-from sqlalchemy import func
-from datetime import datetime
-
-from datetime import datetime
+from db_ops import get_session, pool_status
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import aliased
+from functools import cached_property
+from datetime import datetime, timedelta, timezone
 import uuid
+from uuid import UUID
 
-from models import Club, Event, OfficerRole, Student, EventRsvp
+from models import Club, ClubMembership, Event, EventRsvp, EventStatus, OfficerRole, Review, Student
+from club_stats import bump_members, bump_registered, bump_reviews, event_removed, event_saved, get_club_stats, is_upcoming
+from club_metrics import club_metrics, club_metrics_batch
+from analytics import record_view
+from http_cache import all_clubs_version, club_version, conditional
+from instrumentation import sql_budget
+from response_cache import ALL_CLUBS, cache_stats, cached, club_tag, invalidate_club
+from pagination import InvalidCursor, page_size, paginate
+from memberships import add_member, club_member_count, has_role, remove_member, student_club_ids
+from event_format import display_datetime, display_many
+from event_lifecycle import UPCOMING, status_for, upcoming_clause
+from rsvps import WAITLISTED, fill_open_seats, registered_counts, student_event_sets, toggle_rsvp, waitlist_position
 
 
 def _parse_iso_dt(value: str | None):
@@ -21,23 +33,46 @@ def _parse_iso_dt(value: str | None):
     return datetime.fromisoformat(v)
 
 api_bp = Blueprint("api", __name__)
+log = logging.getLogger(__name__)
+
+
+@api_bp.errorhandler(InvalidCursor)
+def invalid_cursor(e):
+    return jsonify({"error": "invalid_cursor", "detail": str(e)}), 400
+
+
+def _wants_page() -> bool:
+    # Array endpoints return a {"items", "nextCursor"} page only when asked,
+    # so existing clients keep receiving the full list.
+    return "limit" in request.args or "after" in request.args
+
 
 @api_bp.get("/clubs")
+@conditional(all_clubs_version, cache_control="public, max-age=10, stale-while-revalidate=30")
+@cached(lambda **_: [ALL_CLUBS])
 def get_clubs():
     q = request.args.get("q", "").strip()
     school = request.args.get("school")
     category = request.args.get("category")
     verified = request.args.get("verified", "false").lower() == "true"
     sort = request.args.get("sort", "discoverability")
+    limit = page_size(request.args.get("limit"))
     try:
-        limit = int(request.args.get("limit", "50"))
         offset = int(request.args.get("offset", "0"))
     except Exception:
-        limit, offset = 50, 0
+        offset = 0
+    after = request.args.get("after") or None
+    include_total = request.args.get("includeTotal")
+    if include_total is not None:
+        include_total = include_total.lower() == "true"
 
     # If "smart=true", use smart search
     if request.args.get("smart", "false").lower() == "true":
-        return jsonify(search_clubs_smart(q=q))
+        return jsonify(search_clubs_smart(
+            q=q,
+            limit=limit if "limit" in request.args else None,
+            offset=offset,
+        ))
 
     data = list_clubs(
         q=q,
@@ -47,6 +82,8 @@ def get_clubs():
         sort_by=sort,
         limit=limit,
         offset=offset,
+        after=after,
+        include_total=include_total,
     )
     return jsonify(data)
 
@@ -54,19 +91,69 @@ def get_clubs():
 def post_club():
     payload = request.get_json(force=True) or {}
     club_id = create_club(payload)
+    invalidate_club()
     return jsonify({"id": club_id}), 201
 
 # ----------------- Events --------------------
 
+_EVENT_STATUSES = set(EventStatus.enums)
+
+
+def _event_filters() -> dict:
+    """
+    /api/events filters from the query string; raises ValueError naming the bad one.
+      from / to:  ISO date or datetime; events starting in [from, to) (UTC if no offset)
+      clubId:     one or more comma-separated club ids
+      location:   case-insensitive substring of the event location
+      status:     comma-separated subset of upcoming, past, cancelled
+    """
+    args = request.args
+    filters = {}
+    for arg, key in (("from", "starts_from"), ("to", "starts_before")):
+        if args.get(arg):
+            try:
+                value = _parse_iso_dt(args[arg])
+            except ValueError:
+                raise ValueError(arg)
+            filters[key] = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if args.get("clubId"):
+        try:
+            filters["club_ids"] = [uuid.UUID(p.strip()) for p in args["clubId"].split(",") if p.strip()]
+        except ValueError:
+            raise ValueError("clubId")
+    if args.get("location", "").strip():
+        filters["location"] = args["location"].strip()
+    if args.get("status"):
+        statuses = [p.strip() for p in args["status"].split(",") if p.strip()]
+        if not set(statuses) <= _EVENT_STATUSES:
+            raise ValueError("status")
+        filters["statuses"] = statuses
+    return filters
+
+
 @api_bp.get("/events")
+@conditional(all_clubs_version, cache_control="public, max-age=10, stale-while-revalidate=30")
+@cached(lambda **_: [ALL_CLUBS])
 def get_events():
     upcoming = request.args.get("upcoming", "true").lower() != "false"
-    return jsonify(list_events(upcoming_only=upcoming))
+    try:
+        filters = _event_filters()
+    except ValueError as e:
+        return jsonify({"error": "invalid_filter", "detail": str(e)}), 400
+    if _wants_page():
+        return jsonify(list_events_page(
+            upcoming_only=upcoming,
+            limit=page_size(request.args.get("limit")),
+            after=request.args.get("after") or None,
+            **filters,
+        ))
+    return jsonify(list_events(upcoming_only=upcoming, **filters))
 
 @api_bp.post("/events")
 def post_event():
     payload = request.get_json(force=True) or {}
     event_id = create_event(payload)
+    invalidate_club(payload.get("clubId"))
     return jsonify({"id": event_id}), 201
 
 # ------------ Health ----------------
@@ -75,97 +162,60 @@ def health():
     return {"ok": True}
 
 
-# ---------- Officer / Analytics ----------
-@api_bp.get("/clubs/<uuid:club_id>/metrics")
-def get_club_metrics(club_id):
-    with get_session() as session:
-        club = session.get(Club, club_id)
-        if not club:
-            return jsonify({"error": "Club not found"}), 404
+@api_bp.get("/metrics/pool")
+def db_pool_metrics():
+    """Connection pool occupancy and checkout wait times for this worker."""
+    return jsonify(pool_status())
 
-        # Count all unique members from member_ids, officers, and OfficerRole table
-        member_set = set(club.member_ids or [])
-        member_set.update(club.officers or [])
-        
-        # Add members from OfficerRole table
-        officer_role_rows = session.query(OfficerRole).filter(OfficerRole.club_id == club_id).all()
-        for role in officer_role_rows:
-            member_set.add(role.student_id)
-        
-        members = len(member_set)
 
-        events = session.query(Event).filter(Event.club_id == club_id).all()
-        total_registered = sum(len(e.rsvp_ids or []) for e in events)
-        total_attended = sum(len(e.attendee_ids or []) for e in events)
-        attendance_rate = round(
-            (total_attended / total_registered) * 100, 1
-        ) if total_registered else 0.0
+@api_bp.get("/metrics/cache")
+def response_cache_metrics():
+    """Response cache size, hit rate and invalidations for this worker."""
+    return jsonify(cache_stats())
 
-        #RAGHAV WHOEVER DID THE METRICS LEFT THIS AS A PLACEHOLDER.
-        #I DONT THINK THIS IS USEFUL AT ALL BUT NOT DELETING IT IN CASE
 
-        """
-        # (Optional) rating example if you need later:
-        avg_rating = session.query(func.avg(Review.rating))\
-             .filter(Review.club_id == club_id).scalar() or 0
+# ---------- Officer / Analytics ----------
+_METRICS_BATCH_MAX = 200
 
-        #Simple placeholders—replace with real analytics later
-        """
 
-        # Calculate member growth (placeholder - would need historical data)
-        # For now, estimate based on recent activity
-        member_growth = 0  # Set to 0 since we don't have historical data
-        
-        # Profile views - placeholder (would need analytics tracking)
-        profile_views = members * 5  # Rough estimate: 5 views per member
-        
-        # Profile growth (placeholder - would need historical view data)
-        profile_growth = 0  # Set to 0 since we don't have historical data
-        
-        # Freshness score - based on last updated date
-        from datetime import datetime, timezone
-        if club.last_updated_at:
-            days_since_update = (datetime.now(timezone.utc) - club.last_updated_at).days
-            freshness_score = max(0, min(100, 100 - (days_since_update * 2)))
-        else:
-            freshness_score = 50  # Neutral score if never updated
-        
-        # Engagement score - combine attendance rate and event count
-        event_factor = min(100, len(events) * 10)  # More events = higher engagement
-        engagement_score = min(100, int(0.5 * attendance_rate + 0.3 * event_factor + 0.2 * freshness_score))
+@api_bp.get("/clubs/metrics")
+@sql_budget(ms=1500)  # up to _METRICS_BATCH_MAX clubs per call
+def get_clubs_metrics_batch():
+    """
+    Metrics for many clubs at once (officer dashboards).
 
-        event_attendance = int(round(total_attended / len(events))) if events else 0
+    Query params:
+      ?ids=<uuid>,<uuid>,...   (at most 200)
 
-        # Calculate attendance rate change from last month
-        from datetime import datetime, timezone, timedelta
-        now = datetime.now(timezone.utc)
-        last_month_start = (now - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
-        prev_month_start = (now - timedelta(days=60)).replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Events from last month (30-60 days ago)
-        prev_events = [e for e in events if prev_month_start <= e.start_time < last_month_start]
-        prev_registered = sum(len(e.rsvp_ids or []) for e in prev_events)
-        prev_attended = sum(len(e.attendee_ids or []) for e in prev_events)
-        prev_attendance_rate = round(
-            (prev_attended / prev_registered) * 100, 1
-        ) if prev_registered else 0.0
-        
-        # Calculate the change
-        attendance_rate_change = round(attendance_rate - prev_attendance_rate, 1) if prev_attendance_rate else 0.0
+    Response:
+      200 { "<club_id>": { ...same shape as /clubs/<id>/metrics... }, ... }
+      400 { "error": "invalid_ids" | "too_many_ids" }
+    """
+    raw = [p.strip() for p in request.args.get("ids", "").split(",") if p.strip()]
+    try:
+        club_ids = list(dict.fromkeys(uuid.UUID(p) for p in raw))
+    except ValueError:
+        return jsonify({"error": "invalid_ids"}), 400
+    if len(club_ids) > _METRICS_BATCH_MAX:
+        return jsonify({"error": "too_many_ids", "max": _METRICS_BATCH_MAX}), 400
 
-        payload = {
-            "members": members,
-            "memberGrowth": member_growth,
-            "eventAttendance": event_attendance,
-            "attendanceRate": attendance_rate,
-            "attendanceRateChange": attendance_rate_change,
-            "profileViews": profile_views,
-            "profileGrowth": profile_growth,
-            "freshnessScore": freshness_score,
-            "engagementScore": engagement_score,
-        }
+    with get_session() as session:
+        metrics = club_metrics_batch(session, club_ids)
+        return jsonify({str(cid): payload for cid, payload in metrics.items()})
+
+
+@api_bp.get("/clubs/<uuid:club_id>/metrics")
+def get_club_metrics(club_id):
+    with get_session() as session:
+        payload = club_metrics(session, club_id)
+        if payload is None:
+            return jsonify({"error": "Club not found"}), 404
         return jsonify(payload)
+
+
 @api_bp.get("/clubs/<uuid:club_id>/members")
+@conditional(club_version)
+@cached(lambda club_id: [club_tag(club_id)])
 def get_club_members(club_id):
     """
     Returns a flat member list for a club, including:
@@ -174,53 +224,54 @@ def get_club_members(club_id):
     - email
     - position: "president" | "officer" | "member"
     - joinDate: ISO string
-    - eventsAttended: int
+    - eventsAttended: int (this club's events)
 
-    Uses both Club arrays AND OfficerRole for membership.
+    Membership comes from club_memberships, positions from OfficerRole.
     """
     with get_session() as session:
         club = session.get(Club, club_id)
         if not club:
             return jsonify({"error": "Club not found"}), 404
 
-        # base membership from arrays (if you ever use them)
-        member_ids = set(
-            (club.member_ids or [])
-            + (club.officers or [])
-            + (club.president_ids or [])
+        # membership rows (one per member) joined to students
+        rows = (
+            session.query(ClubMembership, Student)
+            .join(Student, ClubMembership.student_id == Student.id)
+            .filter(ClubMembership.club_id == club_id)
+            .all()
         )
 
-        # add from OfficerRole (source of truth for officers/president)
+        if not rows:
+            return jsonify([])
+
+        # positions from OfficerRole (source of truth for officers/president)
         role_rows = (
-            session.query(OfficerRole)
+            session.query(OfficerRole.student_id, OfficerRole.role)
             .filter(OfficerRole.club_id == club_id)
             .all()
         )
-
-        president_ids = set()
-        officer_ids = set()
-
-        for r in role_rows:
-            member_ids.add(r.student_id)
-            if r.role == "president":
-                president_ids.add(r.student_id)
-            elif r.role == "officer":
-                officer_ids.add(r.student_id)
-
-        if not member_ids:
-            return jsonify([])
-
-        students = (
-            session.query(Student)
-            .filter(Student.id.in_(member_ids))
+        president_ids = {sid for sid, role in role_rows if role == "president"}
+        officer_ids = {sid for sid, role in role_rows if role in ("officer", "managing_exec")}
+
+        # attendance at this club's events only, so the club's ETag / cache tag covers it
+        member_ids = [stu.id for _, stu in rows]
+        attended_counts = dict(
+            session.query(EventRsvp.student_id, func.count(EventRsvp.id))
+            .join(Event, Event.id == EventRsvp.event_id)
+            .filter(
+                Event.club_id == club_id,
+                EventRsvp.student_id.in_(member_ids),
+                EventRsvp.attended.is_(True),
+            )
+            .group_by(EventRsvp.student_id)
             .all()
         )
 
         results = []
-        for s in students:
+        for membership, s in rows:
             if s.id in president_ids:
                 position = "president"
-            elif s.id in officer_ids or club.id in (s.officer_clubs or []):
+            elif s.id in officer_ids:
                 position = "officer"
             else:
                 position = "member"
@@ -231,8 +282,8 @@ def get_club_members(club_id):
                     "name": s.name,
                     "email": s.email,
                     "position": position,
-                    "joinDate": s.created_at.isoformat(),
-                    "eventsAttended": len(s.attended_events or []),
+                    "joinDate": membership.joined_at.isoformat(),
+                    "eventsAttended": attended_counts.get(s.id, 0),
                 }
             )
 
@@ -253,8 +304,7 @@ def kick_member(club_id):
       { "userId": "<student_uuid>", "kickedBy": "<president_uuid>" }
     
     - kickedBy must be a president of the club
-    - Removes the member from all club arrays and OfficerRole table
-    - Removes club from student's my_clubs and officer_clubs arrays
+    - Removes the club_memberships row and OfficerRole entries
     - Prevents presidents from kicking themselves or other presidents
     """
     data = request.get_json(force=True) or {}
@@ -302,24 +352,17 @@ def kick_member(club_id):
         if not member:
             return jsonify({"error": "member_not_found"}), 404
         
-        # Remove from club arrays
-        club.member_ids = [m for m in (club.member_ids or []) if m != uuid.UUID(member_id)]
-        club.officers = [o for o in (club.officers or []) if o != uuid.UUID(member_id)]
-        
-        # Remove OfficerRole entries for this student in this club
-        session.query(OfficerRole).filter(
-            OfficerRole.club_id == club_id,
-            OfficerRole.student_id == uuid.UUID(member_id)
-        ).delete()
-        
-        # Remove club from student's arrays
-        member.my_clubs = [c for c in (member.my_clubs or []) if c != club_id]
-        member.officer_clubs = [c for c in (member.officer_clubs or []) if c != club_id]
+        # Remove membership + OfficerRole entries for this student in this club
+        if remove_member(session, club_id, member.id):
+            bump_members(session, club_id, -1)
+
+        # Favorites are not membership; drop the club from them too
         member.favorite_clubs = [c for c in (member.favorite_clubs or []) if c != club_id]
         
         session.commit()
+        invalidate_club(club_id)
         
-        return jsonify({"kicked": True, "memberCount": len(club.member_ids or [])}), 200
+        return jsonify({"kicked": True, "memberCount": club_member_count(session, club_id)}), 200
 
 
 @api_bp.post("/clubs/<uuid:club_id>/members")
@@ -338,8 +381,7 @@ def add_club_member(club_id):
     """
     # Get current user from session cookie
     token = request.cookies.get(auth_cookie_name(), "")
-    print(f"[ADD MEMBER] Cookie name: {auth_cookie_name()}, Token: {token[:20] if token else 'NONE'}")
-    print(f"[ADD MEMBER] All cookies: {list(request.cookies.keys())}")
+    log.debug("add member: session cookie %s", "present" if token else "missing")
     if not token:
         return jsonify({"error": "Not authenticated"}), 401
     
@@ -355,10 +397,7 @@ def add_club_member(club_id):
             return jsonify({"error": "Club not found"}), 404
         
         # Check if current user is president or officer
-        is_president = current_user_id in (club.president_ids or [])
-        is_officer = current_user_id in (club.officers or [])
-        
-        if not (is_president or is_officer):
+        if not has_role(session, club_id, current_user_id, ("president", "managing_exec", "officer")):
             return jsonify({"error": "Not authorized. Only presidents and officers can add members."}), 403
         
         # Get email from request body
@@ -374,19 +413,13 @@ def add_club_member(club_id):
         if not student:
             return jsonify({"error": "No user found with that email address"}), 404
         
-        # Check if already a member
-        if student.id in (club.member_ids or []):
+        # Add student to club (no-op insert if already a member)
+        if not add_member(session, club.id, student.id):
             return jsonify({"error": "User is already a member of this club"}), 400
         
-        # Add student to club
-        club.member_ids = list(club.member_ids or []) + [student.id]
-        
-        # Add club to student's my_clubs
-        student.my_clubs = list(student.my_clubs or [])
-        if club.id not in student.my_clubs:
-            student.my_clubs.append(club.id)
-        
+        bump_members(session, club.id, 1)
         session.commit()
+        invalidate_club(club_id)
         
         return jsonify({
             "success": True,
@@ -396,7 +429,7 @@ def add_club_member(club_id):
                 "name": student.name,
                 "email": student.email
             },
-            "memberCount": len(club.member_ids or [])
+            "memberCount": club_member_count(session, club.id)
         }), 200
 
 
@@ -406,13 +439,12 @@ def remove_club_member(club_id, member_id):
     Remove a member from a club (president only) - Cookie-based authentication version.
     
     - Validates the current user is the president via ecn_session cookie
-    - Removes the member from all club arrays and OfficerRole table
-    - Removes club from student's my_clubs and officer_clubs arrays
+    - Removes the club_memberships row and OfficerRole entries
     - Prevents presidents from removing themselves or other presidents
     """
     # Get current user from session cookie
     token = request.cookies.get(auth_cookie_name(), "")
-    print(f"[DELETE MEMBER] Token: {token[:20] if token else 'NONE'}, All cookies: {list(request.cookies.keys())}")
+    log.debug("delete member: session cookie %s", "present" if token else "missing")
     if not token:
         return jsonify({"error": "Not authenticated"}), 401
     
@@ -457,22 +489,15 @@ def remove_club_member(club_id, member_id):
         if not member:
             return jsonify({"error": "Member not found"}), 404
         
-        # Remove from club arrays
-        club.member_ids = [m for m in (club.member_ids or []) if m != member_id]
-        club.officers = [o for o in (club.officers or []) if o != member_id]
-        
-        # Remove OfficerRole entries for this student in this club
-        session.query(OfficerRole).filter(
-            OfficerRole.club_id == club_id,
-            OfficerRole.student_id == member_id
-        ).delete()
-        
-        # Remove club from student's arrays
-        member.my_clubs = [c for c in (member.my_clubs or []) if c != club_id]
-        member.officer_clubs = [c for c in (member.officer_clubs or []) if c != club_id]
+        # Remove membership + OfficerRole entries for this student in this club
+        if remove_member(session, club_id, member_id):
+            bump_members(session, club_id, -1)
+
+        # Favorites are not membership; drop the club from them too
         member.favorite_clubs = [c for c in (member.favorite_clubs or []) if c != club_id]
         
         session.commit()
+        invalidate_club(club_id)
         
         return jsonify({"success": True, "message": f"Member {member.name} removed from club"}), 200
 
@@ -525,9 +550,9 @@ def promote_member(club_id):
                 )
                 session.add(new_officer)
             
-            # Update Club/Student Arrays
-            if target_uuid not in (club.officers or []):
-                club.officers = list(club.officers or []) + [target_uuid]
+            # Officers are always members
+            if add_member(session, club_id, target_uuid):
+                bump_members(session, club_id, 1)
 
         elif new_role == "president":
             # Delete all existing roles for both users to avoid constraint violation
@@ -554,14 +579,18 @@ def promote_member(club_id):
             )
             session.add(new_pres)
 
-            # Update Arrays
-            club.president_ids = [target_uuid]
+            # Presidents are always members
+            if add_member(session, club_id, target_uuid):
+                bump_members(session, club_id, 1)
             
         session.commit()
+        invalidate_club(club_id)
         return jsonify({"success": True})
 
 
 @api_bp.get("/clubs/<uuid:club_id>/events")
+@conditional(club_version)
+@cached(lambda club_id: [club_tag(club_id)])
 def get_club_events(club_id):
     """
     Returns events for a given club, shaped for the ForOfficers UI.
@@ -576,17 +605,18 @@ def get_club_events(club_id):
         q = session.query(Event).filter(Event.club_id == club_id)
 
         if upcoming:
-            q = q.filter(Event.start_time >= datetime.utcnow())
-
-        events = q.order_by(Event.start_time.asc()).all()
+            q = q.filter(upcoming_clause(datetime.now(timezone.utc)))
 
-        def fmt_time(dt):
-            if not dt:
-                return None
-            from zoneinfo import ZoneInfo
-            from datetime import timezone
-            est_time = dt.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York"))
-            return est_time.strftime("%-I:%M %p")
+        paged = _wants_page()
+        if paged:
+            events, next_cursor = paginate(
+                q, EVENT_PAGE_KEYS, "club-events", page_size(request.args.get("limit")),
+                request.args.get("after") or None, key_of=lambda e: (e.start_time, e.id),
+            )
+        else:
+            events = q.order_by(Event.start_time.asc()).all()
+        registered = registered_counts(session, [e.id for e in events])
+        shown = display_many(e.start_time for e in events)
 
         payload = [
             {
@@ -594,54 +624,18 @@ def get_club_events(club_id):
                 "name": e.title,
                 "description": e.description,
                 "date": e.start_time.date().isoformat() if e.start_time else None,
-                "time": fmt_time(e.start_time),
+                "time": time_str,
                 "startTime": e.start_time.isoformat() if e.start_time else None,
                 "location": e.location,
                 "capacity": e.rsvp_limit,
-                "registered": len(e.rsvp_ids or []),
+                "registered": registered.get(e.id, 0),
                 "status": e.status,
             }
-            for e in events
-        ]
-
-
-        return jsonify(payload)
-
-    """
-    Returns events for a given club, shaped for the ForOfficers UI.
-    """
-    upcoming = request.args.get("upcoming", "true").lower() != "false"
-
-    with get_session() as session:
-        club = session.get(Club, club_id)
-        if not club:
-            return jsonify({"error": "Club not found"}), 404
-
-        q = session.query(Event).filter(Event.club_id == club_id)
-
-        if upcoming:
-            q = q.filter(Event.start_time >= datetime.utcnow())
-
-        events = q.order_by(Event.start_time.asc()).all()
-
-        def fmt_time(dt):
-            # "7:00 PM" style
-            return dt.strftime("%-I:%M %p") if dt else None
-
-        payload = [
-            {
-                "id": str(e.id),
-                "name": e.title,
-                "date": e.start_time.date().isoformat() if e.start_time else None,
-                "time": fmt_time(e.start_time),
-                "location": e.location,
-                "capacity": e.rsvp_limit,
-                "registered": len(e.rsvp_ids or []),
-                "status": e.status,  # "draft" | "published" | "live"
-            }
-            for e in events
+            for e, (_, time_str) in zip(events, shown)
         ]
 
+        if paged:
+            return jsonify({"items": payload, "nextCursor": next_cursor})
         return jsonify(payload)
 
 
@@ -750,22 +744,15 @@ def auth_logout_route():
     return resp
 
 
-from datetime import datetime
-from flask import Blueprint, request, jsonify
-from db_ops import get_session
-from models import Club
-
-# ... existing code ...
-
 # ---------- Club Profile (GET / PUT) ----------
 
 @api_bp.get("/clubs/<uuid:club_id>/profile")
+@conditional(club_version, on_request=lambda club_id: record_view(club_id))
+@cached(lambda club_id: [club_tag(club_id)])
 def get_club_profile(club_id):
     """
     Returns the editable profile for a single club + lightweight leadership info.
     """
-    from datetime import datetime  
-
     with get_session() as session:
         club = session.get(Club, club_id)
         if not club:
@@ -910,7 +897,9 @@ def update_club_profile(club_id):
 
         session.add(club)
         session.commit()
+        invalidate_club(club_id)
         session.refresh(club)
+        index_club(club.id, club.name, club.description, club.purpose, club.updated_at)
 
         payload = {
             "id": str(club.id),
@@ -965,9 +954,6 @@ def get_user_officer_clubs(user_id):
         return jsonify(payload)
 
 
-from sqlalchemy import func  # if not already imported
-# ...
-
 @api_bp.get("/students/<uuid:student_id>/officer-clubs")
 def get_officer_clubs(student_id):
     """
@@ -1018,22 +1004,31 @@ def update_event(event_id):
         if not event:
             return jsonify({"error": "Event not found"}), 404
 
+        was_upcoming = is_upcoming(event)
         if "title" in body:
             event.title = body["title"]
         if "description" in body:
             event.description = body["description"]
         if "location" in body:
             event.location = body["location"]
-        if "capacity" in body:
+        capacity_changed = "capacity" in body and body["capacity"] != event.rsvp_limit
+        if capacity_changed:
             event.rsvp_limit = body["capacity"]
 
         if "startTime" in body:
             event.start_time = _parse_iso_dt(body["startTime"])
+            # rescheduling can move a past event back to upcoming
+            event.status = status_for(event.start_time, event.status)
         if "endTime" in body:
             event.end_time = _parse_iso_dt(body["endTime"])
 
         session.add(event)
+        if capacity_changed:
+            promoted = fill_open_seats(session, event.id)
+            bump_registered(session, event.club_id, len(promoted))
+        event_saved(session, event, was_upcoming)
         session.commit()
+        invalidate_club(event.club_id)
 
         return jsonify({"ok": True})
 
@@ -1044,35 +1039,13 @@ def delete_event(event_id):
         if not event:
             return jsonify({"error": "Event not found"}), 404
 
+        club_id = event.club_id
+        event_removed(session, event)
         session.delete(event)
         session.commit()
+        invalidate_club(club_id)
         return jsonify({"ok": True})
 
-from datetime import datetime
-from uuid import UUID
-
-from flask import Blueprint, request, jsonify
-from uuid import UUID
-from datetime import datetime
-
-from models import Student, Event, EventRsvp  # we don't need RsvpStatus here
-from db_ops import get_session
-
-
-
-from uuid import UUID
-from datetime import datetime
-
-from models import Student, Event, EventRsvp
-from db_ops import get_session
-
-
-from datetime import datetime
-from flask import current_app  # at top of routes.py if not already
-
-from db_ops import get_session
-from models import Student, Event, EventRsvp
-
 # ============================================================
 # MY CLUBS ENDPOINTS - Add these to your routes.py
 # ============================================================
@@ -1085,208 +1058,260 @@ from models import Student, Event, EventRsvp
 
 # ---------- My Clubs Endpoints ----------
 
-@api_bp.get("/students/<uuid:student_id>/my-clubs")
-def get_student_my_clubs(student_id):
+class _StudentDashboard:
     """
-    Returns all clubs a student has joined OR is an officer of, with engagement metrics and upcoming events.
+    Per-request view of one student's clubs. Each piece (club set, clubs, roles,
+    reviews, RSVP sets, events) is loaded at most once and shared by the
+    my-clubs / upcoming-events / stats / recent-activity sections, so
+    /students/<id>/dashboard costs the same queries as the largest section alone.
     """
-    from datetime import datetime, timezone, timedelta
-    
-    with get_session() as session:
-        student = session.get(Student, student_id)
-        if not student:
-            return jsonify({"error": "Student not found"}), 404
-        
-        # Get club IDs from student's my_clubs array
-        club_ids_from_my_clubs = set(student.my_clubs or [])
-        
-        # Get club IDs from student's officer_clubs array
-        club_ids_from_officer_clubs = set(student.officer_clubs or [])
-        
-        # Get club IDs from OfficerRole table (most reliable source)
-        officer_role_rows = (
-            session.query(OfficerRole)
-            .filter(OfficerRole.student_id == student_id)
-            .all()
+
+    def __init__(self, session, student_id):
+        self.session = session
+        self.student_id = student_id
+        self.now = datetime.now(timezone.utc)
+
+    @cached_property
+    def club_ids(self) -> list:
+        # Every club the student belongs to (officers always have a membership row)
+        return student_club_ids(self.session, self.student_id)
+
+    @cached_property
+    def clubs(self) -> dict:
+        if not self.club_ids:
+            return {}
+        return {c.id: c for c in self.session.query(Club).filter(Club.id.in_(self.club_ids)).all()}
+
+    @cached_property
+    def officer_roles(self) -> list:
+        return self.session.query(OfficerRole).filter(OfficerRole.student_id == self.student_id).all()
+
+    @cached_property
+    def rsvp_sets(self) -> tuple[set, set]:
+        # Student's RSVPs / attendance, looked up once as sets
+        return student_event_sets(self.session, self.student_id)
+
+    @cached_property
+    def events(self) -> dict:
+        return _dashboard_events(self.session, self.club_ids, self.now)
+
+
+def _dashboard_events(session, club_ids, now, upcoming_n=3, recent_n=5, recent_days=30,
+                      feed_n=20, activity_n=10) -> dict:
+    """
+    Every event list the dashboard sections need, from one window-function query:
+      upcoming_by_club: {club_id: next `upcoming_n` events, soonest first}
+      recent_by_club:   {club_id: latest `recent_n` events starting within `recent_days`, newest first}
+      upcoming:         next `feed_n` events across all clubs, soonest first
+      activity:         `activity_n` most recently updated events starting within `recent_days`
+    """
+    sections = {"upcoming_by_club": {}, "recent_by_club": {}, "upcoming": [], "activity": []}
+    if not club_ids:
+        return sections
+
+    is_upcoming = upcoming_clause(now)
+    ranked = (
+        select(
+            Event,
+            func.row_number().over(
+                partition_by=(Event.club_id, is_upcoming), order_by=Event.start_time.asc()
+            ).label("club_upcoming_rank"),
+            func.row_number().over(
+                partition_by=Event.club_id, order_by=Event.start_time.desc()
+            ).label("club_recent_rank"),
+            func.row_number().over(
+                partition_by=is_upcoming, order_by=Event.start_time.asc()
+            ).label("upcoming_rank"),
+            func.row_number().over(
+                order_by=Event.updated_at.desc()
+            ).label("activity_rank"),
         )
-        club_ids_from_officer_roles = set(r.club_id for r in officer_role_rows)
-        
-        # Combine all sources of club membership
-        club_ids = list(club_ids_from_my_clubs | club_ids_from_officer_clubs | club_ids_from_officer_roles)
-        
-        if not club_ids:
-            return jsonify([])
+        .where(
+            Event.club_id.in_(club_ids),
+            Event.start_time >= now - timedelta(days=recent_days),
+        )
+        .subquery()
+    )
+    evt = aliased(Event, ranked)
+    upcoming_row = upcoming_clause(now, ranked.c)
+    rows = session.execute(
+        select(
+            evt,
+            ranked.c.club_upcoming_rank,
+            ranked.c.club_recent_rank,
+            ranked.c.upcoming_rank,
+            ranked.c.activity_rank,
+        )
+        .where(or_(
+            upcoming_row & (ranked.c.club_upcoming_rank <= upcoming_n),
+            ranked.c.club_recent_rank <= recent_n,
+            upcoming_row & (ranked.c.upcoming_rank <= feed_n),
+            ranked.c.activity_rank <= activity_n,
+        ))
+        .order_by(ranked.c.start_time)
+    ).all()
+
+    activity = []
+    for e, club_up, club_recent, up, act in rows:
+        is_up = e.status == UPCOMING and e.start_time >= now
+        if is_up and club_up <= upcoming_n:
+            sections["upcoming_by_club"].setdefault(e.club_id, []).append(e)
+        if club_recent <= recent_n:
+            sections["recent_by_club"].setdefault(e.club_id, []).append(e)
+        if is_up and up <= feed_n:
+            sections["upcoming"].append(e)
+        if act <= activity_n:
+            activity.append((act, e))
+    for events in sections["recent_by_club"].values():
+        events.reverse()
+    sections["activity"] = [e for _, e in sorted(activity, key=lambda pair: pair[0])]
+    return sections
+
+
+def _my_clubs_section(dash: _StudentDashboard) -> list:
+    session, student_id, club_ids = dash.session, dash.student_id, dash.club_ids
+    if not club_ids:
+        return []
+
+    clubs = list(dash.clubs.values())
+    stats_by_club = get_club_stats(session, club_ids)
+
+    # Fetch user reviews for these clubs
+    user_reviews = (
+        session.query(Review)
+        .filter(
+            Review.student_id == student_id,
+            Review.club_id.in_(club_ids)
+        )
+        .all()
+    )
+    # Create a lookup dict: club_id -> rating
+    review_map = {r.club_id: r.rating for r in user_reviews}
+
+    # Build role lookup: club_id -> role
+    role_lookup = {}
+    for r in dash.officer_roles:
+        if r.club_id not in dash.clubs:
+            continue
+        # Prioritize higher roles
+        current = role_lookup.get(r.club_id)
+        if r.role == "president":
+            role_lookup[r.club_id] = "President"
+        elif r.role in ("managing_exec", "officer") and current != "President":
+            role_lookup[r.club_id] = "Officer"
+
+    student_rsvped, student_attended = dash.rsvp_sets
+
+    results = []
+    now = dash.now
+
+    # Next 3 upcoming and latest 5 recent (past 30 days) events for every club in one query
+    upcoming_by_club = dash.events["upcoming_by_club"]
+    recent_by_club = dash.events["recent_by_club"]
+
+    for club in clubs:
+        # Determine role
+        role = role_lookup.get(club.id, "Member")
         
-        # Fetch all clubs
-        clubs = session.query(Club).filter(Club.id.in_(club_ids)).all()
+        # Get member count from the maintained club_stats row
+        club_stats = stats_by_club.get(club.id)
+        member_count = club_stats.member_count if club_stats else 0
+
         
-        # Fetch user reviews for these clubs
-        user_reviews = (
-            session.query(Review)
-            .filter(
-                Review.student_id == student_id,
-                Review.club_id.in_(club_ids)
-            )
-            .all()
-        )
-        # Create a lookup dict: club_id -> rating
-        review_map = {r.club_id: r.rating for r in user_reviews}
+        upcoming_events = upcoming_by_club.get(club.id, [])
+        recent_events = recent_by_club.get(club.id, [])
         
-        # Get officer roles for this student
-        officer_roles = (
-            session.query(OfficerRole)
-            .filter(
-                OfficerRole.student_id == student_id,
-                OfficerRole.club_id.in_(club_ids)
-            )
-            .all()
-        )
+        # Calculate engagement score based on student's participation
+        club_event_ids = [e.id for e in recent_events]
         
-        # Build role lookup: club_id -> role
-        role_lookup = {}
-        for r in officer_roles:
-            # Prioritize higher roles
-            current = role_lookup.get(r.club_id)
-            if r.role == "president":
-                role_lookup[r.club_id] = "President"
-            elif r.role in ("managing_exec", "officer") and current != "President":
-                role_lookup[r.club_id] = "Officer"
+        rsvped_count = len(student_rsvped.intersection(club_event_ids))
+        attended_count = len(student_attended.intersection(club_event_ids))
         
-        results = []
-        # Use timezone-aware datetime
-        now = datetime.now(timezone.utc)
+        if len(club_event_ids) > 0:
+            engagement = min(100, int((attended_count / len(club_event_ids)) * 100 + (rsvped_count * 10)))
+        else:
+            engagement = 50  # Default for clubs with no recent events
+        
+        # Format next event
+        next_event = None
+        if upcoming_events:
+            e = upcoming_events[0]
+            date_str, time_str = display_datetime(e.start_time)
+            next_event = {
+                "id": str(e.id),
+                "name": e.title,
+                "date": date_str,
+                "time": time_str,
+            }
         
-        for club in clubs:
-            # Determine role
-            role = role_lookup.get(club.id, "Member")
-            
-            # Get member count (same logic as services.py list_clubs)
-            member_set = set(club.member_ids or [])
-            member_set.update(club.officers or [])
-            # Add members from OfficerRole table
-            club_officer_roles = session.query(OfficerRole).filter(OfficerRole.club_id == club.id).all()
-            for role_obj in club_officer_roles:
-                member_set.add(role_obj.student_id)
-            member_count = len(member_set)
-
-            
-            # Get upcoming events for this club
-            upcoming_events = (
-                session.query(Event)
-                .filter(
-                    Event.club_id == club.id,
-                    Event.start_time >= now
-                )
-                .order_by(Event.start_time.asc())
-                .limit(3)
-                .all()
-            )
-            
-            # Get recent events (past 30 days) for activity
-            recent_events = (
-                session.query(Event)
-                .filter(
-                    Event.club_id == club.id,
-                    Event.start_time >= now - timedelta(days=30)
-                )
-                .order_by(Event.start_time.desc())
-                .limit(5)
-                .all()
-            )
-            
-            # Calculate engagement score based on student's participation
-            student_rsvped = student.rsvped_events or []
-            student_attended = student.attended_events or []
-            club_event_ids = [e.id for e in recent_events]
-            
-            rsvped_count = len([eid for eid in student_rsvped if eid in club_event_ids])
-            attended_count = len([eid for eid in student_attended if eid in club_event_ids])
-            
-            if len(club_event_ids) > 0:
-                engagement = min(100, int((attended_count / len(club_event_ids)) * 100 + (rsvped_count * 10)))
-            else:
-                engagement = 50  # Default for clubs with no recent events
-            
-            # Format next event
-            next_event = None
-            if upcoming_events:
-                e = upcoming_events[0]
-                from zoneinfo import ZoneInfo
-                est_time = e.start_time.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York"))
-                next_event = {
-                    "id": str(e.id),
-                    "name": e.title,
-                    "date": est_time.strftime("%b %d") if e.start_time else None,
-                    "time": est_time.strftime("%-I:%M %p") if e.start_time else None,
-                }
-            
-            # Build recent activity from events
-            recent_activity = []
-            for e in recent_events[:3]:
-                # Make sure we're comparing timezone-aware datetimes
-                event_time = e.start_time
-                if event_time:
-                    # If event_time is naive, make it aware
-                    if event_time.tzinfo is None:
-                        event_time = event_time.replace(tzinfo=timezone.utc)
-                    
-                    if event_time < now:
-                        time_diff = now - event_time
-                    else:
-                        time_diff = event_time - now
-                    
-                    if time_diff.days > 0:
-                        time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
-                    elif time_diff.seconds > 3600:
-                        hours = time_diff.seconds // 3600
-                        time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
-                    else:
-                        time_str = "Recently"
-                    
-                    activity_type = "event" if event_time >= now else "update"
+        # Build recent activity from events
+        recent_activity = []
+        for e in recent_events[:3]:
+            event_time = e.start_time
+            if event_time:
+                if event_time < now:
+                    time_diff = now - event_time
                 else:
-                    time_str = "Recently"
-                    activity_type = "update"
+                    time_diff = event_time - now
                 
-                recent_activity.append({
-                    "type": activity_type,
-                    "title": e.title,
-                    "time": time_str,
-                })
-            
-            # Calculate last activity time
-            last_activity = "Unknown"
-            if club.updated_at:
-                updated_at = club.updated_at
-                # If updated_at is naive, make it aware
-                if updated_at.tzinfo is None:
-                    updated_at = updated_at.replace(tzinfo=timezone.utc)
-                
-                time_diff = now - updated_at
                 if time_diff.days > 0:
-                    last_activity = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
+                    time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
                 elif time_diff.seconds > 3600:
                     hours = time_diff.seconds // 3600
-                    last_activity = f"{hours} hour{'s' if hours > 1 else ''} ago"
+                    time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
                 else:
-                    last_activity = "Recently"
+                    time_str = "Recently"
+                
+                activity_type = "event" if e.status == UPCOMING else "update"
+            else:
+                time_str = "Recently"
+                activity_type = "update"
             
-            results.append({
-                "id": str(club.id),
-                "name": club.name,
-                "role": role,
-                "joinDate": club.created_at.isoformat() if club.created_at else None,
-                "category": "General",  # Placeholder
-                "verified": club.verified,
-                "lastActivity": last_activity,
-                "memberCount": member_count,
-                "engagement": engagement,
-                "nextEvent": next_event,
-                "recentActivity": recent_activity,
-                "userRating": review_map.get(club.id, 0),
+            recent_activity.append({
+                "type": activity_type,
+                "title": e.title,
+                "time": time_str,
             })
         
-        return jsonify(results)
+        # Calculate last activity time
+        last_activity = "Unknown"
+        if club.updated_at:
+            time_diff = now - club.updated_at
+            if time_diff.days > 0:
+                last_activity = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
+            elif time_diff.seconds > 3600:
+                hours = time_diff.seconds // 3600
+                last_activity = f"{hours} hour{'s' if hours > 1 else ''} ago"
+            else:
+                last_activity = "Recently"
+        
+        results.append({
+            "id": str(club.id),
+            "name": club.name,
+            "role": role,
+            "joinDate": club.created_at.isoformat() if club.created_at else None,
+            "category": "General",  # Placeholder
+            "verified": club.verified,
+            "lastActivity": last_activity,
+            "memberCount": member_count,
+            "engagement": engagement,
+            "nextEvent": next_event,
+            "recentActivity": recent_activity,
+            "userRating": review_map.get(club.id, 0),
+        })
+    
+    return results
+
+
+@api_bp.get("/students/<uuid:student_id>/my-clubs")
+def get_student_my_clubs(student_id):
+    """
+    Returns all clubs a student has joined OR is an officer of, with engagement metrics and upcoming events.
+    """
+    with get_session() as session:
+        if not session.get(Student, student_id):
+            return jsonify({"error": "Student not found"}), 404
+        return jsonify(_my_clubs_section(_StudentDashboard(session, student_id)))
 
 
 @api_bp.post("/clubs/<uuid:club_id>/review")
@@ -1326,6 +1351,7 @@ def rate_club(club_id):
         ).first()
 
         if existing_review:
+            bump_reviews(session, club_id, 0, rating - existing_review.rating)
             existing_review.rating = rating
             existing_review.updated_at = datetime.utcnow()
         else:
@@ -1337,79 +1363,102 @@ def rate_club(club_id):
                 review_text=""
             )
             session.add(new_review)
+            bump_reviews(session, club_id, 1, rating)
         
         session.commit()
+        invalidate_club(club_id)
         return jsonify({"ok": True, "rating": rating}), 200
 
 
+def _upcoming_events_section(dash: _StudentDashboard) -> list:
+    if not dash.club_ids:
+        return []
+
+    # Next 20 upcoming events from student's clubs
+    return _upcoming_event_items(dash, dash.events["upcoming"])
+
+
+def _upcoming_event_items(dash: _StudentDashboard, events) -> list:
+    # Check which events student has RSVPed to
+    student_rsvped, _ = dash.rsvp_sets
+    registered = registered_counts(dash.session, [event.id for event in events])
+
+    results = []
+    for event, (date_str, time_str) in zip(events, display_many(e.start_time for e in events)):
+        club = dash.clubs[event.club_id]
+        results.append({
+            "id": str(event.id),
+            "name": event.title,
+            "description": event.description,
+            "clubId": str(club.id),
+            "clubName": club.name,
+            "date": date_str,
+            "time": time_str,
+            "startTime": event.start_time.isoformat() if event.start_time else None,
+            "location": event.location,
+            "capacity": event.rsvp_limit,
+            "registered": registered.get(event.id, 0),
+            "isRsvped": event.id in student_rsvped,
+        })
+    return results
+
+
 @api_bp.get("/students/<uuid:student_id>/upcoming-events")
 def get_student_upcoming_events(student_id):
     """
-    Returns all upcoming events from clubs the student has joined or is an officer of.
+    Returns upcoming events from clubs the student has joined or is an officer of:
+    the next 20 as a list, or with ?limit= / ?after= a {"items", "nextCursor"} page.
     """
-    from datetime import datetime, timezone
-    
     with get_session() as session:
-        student = session.get(Student, student_id)
-        if not student:
+        if not session.get(Student, student_id):
             return jsonify({"error": "Student not found"}), 404
-        
-        # Get all club IDs (from my_clubs, officer_clubs, and OfficerRole table)
-        club_ids_set = set(student.my_clubs or [])
-        club_ids_set.update(student.officer_clubs or [])
-        
-        # Also check OfficerRole table
-        officer_role_club_ids = (
-            session.query(OfficerRole.club_id)
-            .filter(OfficerRole.student_id == student_id)
-            .all()
+        dash = _StudentDashboard(session, student_id)
+        if not _wants_page():
+            return jsonify(_upcoming_events_section(dash))
+
+        if not dash.club_ids:
+            return jsonify({"items": [], "nextCursor": None})
+        events, next_cursor = paginate(
+            session.query(Event).filter(Event.club_id.in_(dash.club_ids), upcoming_clause(dash.now)),
+            EVENT_PAGE_KEYS, "student-events", page_size(request.args.get("limit")),
+            request.args.get("after") or None, key_of=lambda e: (e.start_time, e.id),
         )
-        club_ids_set.update(r[0] for r in officer_role_club_ids)
-        
-        club_ids = list(club_ids_set)
-        
-        if not club_ids:
-            return jsonify([])
-        
-        # Use timezone-aware datetime
-        now = datetime.now(timezone.utc)
-        
-        # Get upcoming events from student's clubs
-        events = (
-            session.query(Event, Club)
-            .join(Club, Event.club_id == Club.id)
+        return jsonify({"items": _upcoming_event_items(dash, events), "nextCursor": next_cursor})
+
+
+def _stats_section(dash: _StudentDashboard) -> dict:
+    session = dash.session
+    club_ids = dash.club_ids
+
+    # Count leadership roles
+    leadership_roles = sum(
+        1 for r in dash.officer_roles if r.role in ("president", "managing_exec", "officer")
+    )
+
+    # Count upcoming events from student's clubs
+    upcoming_events = 0
+    if club_ids:
+        upcoming_events = (
+            session.query(Event)
             .filter(
                 Event.club_id.in_(club_ids),
-                Event.start_time >= now
+                upcoming_clause(dash.now)
             )
-            .order_by(Event.start_time.asc())
-            .limit(20)
-            .all()
+            .count()
         )
-        
-        # Check which events student has RSVPed to
-        student_rsvped = set(student.rsvped_events or [])
-        
-        results = []
-        from zoneinfo import ZoneInfo
-        for event, club in events:
-            est_time = event.start_time.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York"))
-            results.append({
-                "id": str(event.id),
-                "name": event.title,
-                "description": event.description,
-                "clubId": str(club.id),
-                "clubName": club.name,
-                "date": est_time.strftime("%b %d") if event.start_time else None,
-                "time": est_time.strftime("%-I:%M %p") if event.start_time else None,
-                "startTime": event.start_time.isoformat() if event.start_time else None,
-                "location": event.location,
-                "capacity": event.rsvp_limit,
-                "registered": len(event.rsvp_ids or []),
-                "isRsvped": event.id in student_rsvped,
-            })
-        
-        return jsonify(results)
+
+    # Calculate average engagement (simplified)
+    rsvped_set, attended_set = dash.rsvp_sets
+    attended = len(attended_set)
+    rsvped = len(rsvped_set)
+    avg_engagement = min(100, int((attended + rsvped) * 5)) if (attended + rsvped) > 0 else 50
+
+    return {
+        "clubsJoined": len(club_ids),
+        "upcomingEvents": upcoming_events,
+        "leadershipRoles": leadership_roles,
+        "avgEngagement": avg_engagement,
+    }
 
 
 @api_bp.get("/students/<uuid:student_id>/stats")
@@ -1417,63 +1466,10 @@ def get_student_stats(student_id):
     """
     Returns aggregated stats for the student's club memberships.
     """
-    from datetime import datetime, timezone
-    
     with get_session() as session:
-        student = session.get(Student, student_id)
-        if not student:
+        if not session.get(Student, student_id):
             return jsonify({"error": "Student not found"}), 404
-        
-        # Get all club IDs (from my_clubs, officer_clubs, and OfficerRole table)
-        club_ids_set = set(student.my_clubs or [])
-        club_ids_set.update(student.officer_clubs or [])
-        
-        # Also check OfficerRole table
-        officer_role_club_ids = (
-            session.query(OfficerRole.club_id)
-            .filter(OfficerRole.student_id == student_id)
-            .all()
-        )
-        club_ids_set.update(r[0] for r in officer_role_club_ids)
-        
-        club_ids = list(club_ids_set)
-        clubs_joined = len(club_ids)
-        
-        # Count leadership roles
-        leadership_roles = (
-            session.query(OfficerRole)
-            .filter(
-                OfficerRole.student_id == student_id,
-                OfficerRole.role.in_(["president", "managing_exec", "officer"])
-            )
-            .count()
-        )
-        
-        # Count upcoming events from student's clubs
-        # Use timezone-aware datetime
-        now = datetime.now(timezone.utc)
-        upcoming_events = 0
-        if club_ids:
-            upcoming_events = (
-                session.query(Event)
-                .filter(
-                    Event.club_id.in_(club_ids),
-                    Event.start_time >= now
-                )
-                .count()
-            )
-        
-        # Calculate average engagement (simplified)
-        attended = len(student.attended_events or [])
-        rsvped = len(student.rsvped_events or [])
-        avg_engagement = min(100, int((attended + rsvped) * 5)) if (attended + rsvped) > 0 else 50
-        
-        return jsonify({
-            "clubsJoined": clubs_joined,
-            "upcomingEvents": upcoming_events,
-            "leadershipRoles": leadership_roles,
-            "avgEngagement": avg_engagement,
-        })
+        return jsonify(_stats_section(_StudentDashboard(session, student_id)))
 
 
 @api_bp.get("/students/search")
@@ -1532,27 +1528,17 @@ def join_club(club_id):
         if not club:
             return jsonify({"error": "club_not_found"}), 404
         
-        # Check if already a member
-        student_clubs = list(student.my_clubs or [])
-        club_members = list(club.member_ids or [])
-        
-        if club.id in student_clubs:
+        # Insert the membership row; a conflict means already a member
+        if not add_member(session, club.id, student.id):
             return jsonify({"error": "already_member", "detail": "Student is already a member of this club"}), 400
         
-        # Add to both arrays
-        student_clubs.append(club.id)
-        club_members.append(student.id)
-        
-        student.my_clubs = student_clubs
-        club.member_ids = club_members
-        
-        session.add(student)
-        session.add(club)
+        bump_members(session, club.id, 1)
         session.commit()
+        invalidate_club(club_id)
         
         return jsonify({
             "joined": True,
-            "memberCount": len(club_members),
+            "memberCount": club_member_count(session, club.id),
         }), 201
 
 
@@ -1599,144 +1585,118 @@ def leave_club(club_id):
                 "detail": "You must transfer your leadership role before leaving the club"
             }), 400
         
-        # Remove from both arrays
-        student_clubs = [cid for cid in (student.my_clubs or []) if cid != club.id]
-        club_members = [sid for sid in (club.member_ids or []) if sid != student.id]
-        
-        # Also remove from officer arrays if applicable
-        club_officers = [sid for sid in (club.officers or []) if sid != student.id]
+        # Remove membership row and any remaining (regular officer) role
+        if remove_member(session, club.id, student.id):
+            bump_members(session, club.id, -1)
         
         # Remove from favorite clubs if present
-        favorite_clubs = [cid for cid in (student.favorite_clubs or []) if cid != club.id]
-        officer_clubs = [cid for cid in (student.officer_clubs or []) if cid != club.id]
-        
-        student.my_clubs = student_clubs
-        student.favorite_clubs = favorite_clubs
-        student.officer_clubs = officer_clubs
-        club.member_ids = club_members
-        club.officers = club_officers
+        student.favorite_clubs = [cid for cid in (student.favorite_clubs or []) if cid != club.id]
         
-        # Remove officer role if exists (for regular officer)
-        regular_officer = (
-            session.query(OfficerRole)
-            .filter(
-                OfficerRole.club_id == club_id,
-                OfficerRole.student_id == student_id
-            )
-            .first()
-        )
-        if regular_officer:
-            session.delete(regular_officer)
-        
-        session.add(student)
-        session.add(club)
         session.commit()
+        invalidate_club(club_id)
         
         return jsonify({
             "left": True,
-            "memberCount": len(club_members),
+            "memberCount": club_member_count(session, club.id),
         }), 200
 
 
+def _recent_activity_section(dash: _StudentDashboard) -> list:
+    if not dash.club_ids:
+        return []
+
+    now = dash.now
+    # 10 most recently updated events from student's clubs (past 30 days and upcoming)
+    events = dash.events["activity"]
+
+    results = []
+    for event in events:
+        club = dash.clubs[event.club_id]
+        # Determine time string
+        time_str = "Recently"
+        if event.updated_at:
+            time_diff = now - event.updated_at
+            if time_diff.days > 0:
+                time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
+            elif time_diff.seconds > 3600:
+                hours = time_diff.seconds // 3600
+                time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
+            else:
+                minutes = max(1, time_diff.seconds // 60)
+                time_str = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+
+        # Determine activity type
+        if event.status == UPCOMING:
+            activity_type = "event"
+            title = f"{event.title} scheduled"
+        else:
+            activity_type = "update"
+            title = event.title
+
+        results.append({
+            "id": str(event.id),
+            "type": activity_type,
+            "title": title,
+            "clubId": str(club.id),
+            "clubName": club.name,
+            "time": time_str,
+        })
+    return results
+
+
 @api_bp.get("/students/<uuid:student_id>/recent-activity")
 def get_student_recent_activity(student_id):
     """
     Returns recent activity across all of the student's clubs (joined or officer).
     """
-    from datetime import datetime, timezone, timedelta
-    
     with get_session() as session:
-        student = session.get(Student, student_id)
-        if not student:
+        if not session.get(Student, student_id):
             return jsonify({"error": "Student not found"}), 404
-        
-        # Get all club IDs (from my_clubs, officer_clubs, and OfficerRole table)
-        club_ids_set = set(student.my_clubs or [])
-        club_ids_set.update(student.officer_clubs or [])
-        
-        # Also check OfficerRole table
-        officer_role_club_ids = (
-            session.query(OfficerRole.club_id)
-            .filter(OfficerRole.student_id == student_id)
-            .all()
-        )
-        club_ids_set.update(r[0] for r in officer_role_club_ids)
-        
-        club_ids = list(club_ids_set)
-        
-        if not club_ids:
-            return jsonify([])
-        
-        # Use timezone-aware datetime
-        now = datetime.now(timezone.utc)
-        
-        # Get recent events from student's clubs (past 30 days and upcoming)
-        events = (
-            session.query(Event, Club)
-            .join(Club, Event.club_id == Club.id)
-            .filter(
-                Event.club_id.in_(club_ids),
-                Event.start_time >= now - timedelta(days=30)
-            )
-            .order_by(Event.updated_at.desc())
-            .limit(10)
-            .all()
-        )
-        
-        results = []
-        for event, club in events:
-            # Determine time string
-            time_str = "Recently"
-            if event.updated_at:
-                updated_at = event.updated_at
-                # If updated_at is naive, make it aware
-                if updated_at.tzinfo is None:
-                    updated_at = updated_at.replace(tzinfo=timezone.utc)
-                
-                time_diff = now - updated_at
-                if time_diff.days > 0:
-                    time_str = f"{time_diff.days} day{'s' if time_diff.days > 1 else ''} ago"
-                elif time_diff.seconds > 3600:
-                    hours = time_diff.seconds // 3600
-                    time_str = f"{hours} hour{'s' if hours > 1 else ''} ago"
-                else:
-                    minutes = max(1, time_diff.seconds // 60)
-                    time_str = f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-            
-            # Determine activity type
-            event_time = event.start_time
-            if event_time:
-                # If event_time is naive, make it aware
-                if event_time.tzinfo is None:
-                    event_time = event_time.replace(tzinfo=timezone.utc)
-                
-                if event_time > now:
-                    activity_type = "event"
-                    title = f"{event.title} scheduled"
-                else:
-                    activity_type = "update"
-                    title = event.title
-            else:
-                activity_type = "update"
-                title = event.title
-            
-            results.append({
-                "id": str(event.id),
-                "type": activity_type,
-                "title": title,
-                "clubId": str(club.id),
-                "clubName": club.name,
-                "time": time_str,
-            })
-        
-        return jsonify(results)
+        return jsonify(_recent_activity_section(_StudentDashboard(session, student_id)))
+
+
+_DASHBOARD_SECTIONS = {
+    "myClubs": _my_clubs_section,
+    "upcomingEvents": _upcoming_events_section,
+    "stats": _stats_section,
+    "recentActivity": _recent_activity_section,
+}
+
+
+@api_bp.get("/students/<uuid:student_id>/dashboard")
+def get_student_dashboard(student_id):
+    """
+    my-clubs, upcoming-events, stats and recent-activity in one response,
+    sharing the club set and event queries between sections.
+
+    Query params:
+      ?fields=myClubs,upcomingEvents,stats,recentActivity  (default: all)
+
+    Response:
+      200 { "myClubs": [...], "upcomingEvents": [...], "stats": {...}, "recentActivity": [...] }
+      400 { "error": "unknown_fields", "fields": [...] }
+    """
+    raw = request.args.get("fields", "")
+    fields = [f.strip() for f in raw.split(",") if f.strip()] or list(_DASHBOARD_SECTIONS)
+    unknown = [f for f in fields if f not in _DASHBOARD_SECTIONS]
+    if unknown:
+        return jsonify({"error": "unknown_fields", "fields": unknown}), 400
+
+    with get_session() as session:
+        if not session.get(Student, student_id):
+            return jsonify({"error": "Student not found"}), 404
+        dash = _StudentDashboard(session, student_id)
+        return jsonify({f: _DASHBOARD_SECTIONS[f](dash) for f in fields})
+
+
 @api_bp.post("/events/<uuid:event_id>/rsvp")
 def toggle_event_rsvp(event_id):
     """
     MVP RSVP:
     - expects a UUID string in userId / studentId
-    - toggles that UUID inside Event.rsvp_ids
-    - returns { rsvped, registered }
+    - toggles that student's event_rsvps row; when the event is at capacity
+      the student joins the waitlist instead
+    - returns { rsvped, waitlisted, waitlistPosition, registered, capacity }
     """
     data = request.get_json(force=True) or {}
     raw_id = (data.get("userId") or data.get("studentId") or "").strip()
@@ -1757,27 +1717,24 @@ def toggle_event_rsvp(event_id):
         if not event:
             return jsonify({"error": "event_not_found"}), 404
 
-        existing_ids = list(event.rsvp_ids or [])
-        existing_strs = {str(sid) for sid in existing_ids}
-        user_str = str(user_uuid)
-
-        if user_str in existing_strs:
-            # un-RSVP
-            new_ids = [sid for sid in existing_ids if str(sid) != user_str]
-            rsvped = False
-        else:
-            # RSVP
-            new_ids = existing_ids + [user_uuid]
-            rsvped = True
+        if not session.get(Student, user_uuid):
+            return jsonify({"error": "student_not_found"}), 404
 
-        event.rsvp_ids = new_ids
-        event.updated_at = datetime.utcnow()
-        session.add(event)
+        result = toggle_rsvp(session, event.id, user_uuid)
+        bump_registered(session, event.club_id, result.delta)
+        position = (
+            waitlist_position(session, event.id, user_uuid)
+            if result.status == WAITLISTED else None
+        )
         session.commit()
+        invalidate_club(event.club_id)
 
         return jsonify(
             {
-                "rsvped": rsvped,
-                "registered": len(new_ids),
+                "rsvped": result.status is not None and result.status != WAITLISTED,
+                "waitlisted": result.status == WAITLISTED,
+                "waitlistPosition": position,
+                "registered": result.registered,
+                "capacity": event.rsvp_limit,
             }
         ), 200
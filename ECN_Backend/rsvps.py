@@ -0,0 +1,201 @@
+# rsvps.py
+"""
+RSVP and attendance lookups against the event_rsvps table.
+
+event_rsvps is the source of truth; Event.rsvp_ids / attendee_ids and
+Student.rsvped_events / attended_events are legacy arrays that are no longer written.
+
+Event.rsvp_count counts confirmed RSVPs and never exceeds Event.rsvp_limit.
+Once an event is full, new RSVPs are stored as "waitlisted" and promoted in
+rsvp_time order when a confirmed student drops out or capacity is raised.
+Every write starts by locking the event row, so concurrent signups for one
+event queue on that lock inside a short transaction (lock, insert or delete,
+counter update) and the seat decision can never oversell.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from analytics import record_activity
+from models import Event, EventRsvp
+
+# Statuses that count as "registered" for an event
+REGISTERED_STATUSES = ("going", "interested")
+WAITLISTED = "waitlisted"
+
+
+class RsvpResult(NamedTuple):
+    status: str | None      # the student's status after the toggle (None = no RSVP)
+    registered: int         # confirmed RSVPs for the event after the toggle
+    delta: int              # change in confirmed RSVPs made by this toggle
+    promoted: list          # student ids moved off the waitlist
+
+
+def registered_counts(session, event_ids) -> dict:
+    """{event_id: registered count} for the given events, read from Event.rsvp_count."""
+    if not event_ids:
+        return {}
+    rows = session.execute(
+        select(Event.id, Event.rsvp_count).where(Event.id.in_(list(event_ids)))
+    ).all()
+    return dict(rows)
+
+
+def recount_rsvps(session, event_ids=None) -> None:
+    """Reset Event.rsvp_count from event_rsvps (all events when event_ids is None)."""
+    session.flush()
+    counted = (
+        select(func.count(EventRsvp.id))
+        .where(
+            EventRsvp.event_id == Event.id,
+            EventRsvp.rsvp_status.in_(REGISTERED_STATUSES),
+        )
+        .scalar_subquery()
+    )
+    stmt = update(Event).values(rsvp_count=counted, updated_at=Event.updated_at)
+    if event_ids is not None:
+        stmt = stmt.where(Event.id.in_(list(event_ids)))
+    session.execute(stmt)
+
+
+def student_event_sets(session, student_id, event_ids=None) -> tuple[set, set]:
+    """(rsvped event ids, attended event ids) for a student, optionally limited to event_ids."""
+    stmt = select(EventRsvp.event_id, EventRsvp.rsvp_status, EventRsvp.attended).where(
+        EventRsvp.student_id == student_id
+    )
+    if event_ids is not None:
+        if not event_ids:
+            return set(), set()
+        stmt = stmt.where(EventRsvp.event_id.in_(list(event_ids)))
+
+    rsvped, attended = set(), set()
+    for event_id, status, did_attend in session.execute(stmt):
+        if status in REGISTERED_STATUSES:
+            rsvped.add(event_id)
+        if did_attend:
+            attended.add(event_id)
+    return rsvped, attended
+
+
+def _lock_event(session, event_id):
+    """SELECT ... FOR UPDATE on the event; serializes RSVP writes for that event."""
+    return session.execute(
+        select(Event.rsvp_count, Event.rsvp_limit, Event.club_id)
+        .where(Event.id == event_id)
+        .with_for_update()
+    ).one()
+
+
+def _bump_rsvp_count(session, event_id, delta: int) -> int:
+    """Add delta to the event's counter and return the new value."""
+    return session.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(rsvp_count=Event.rsvp_count + delta)
+        .returning(Event.rsvp_count)
+    ).scalar_one()
+
+
+def _promote(session, event_id, seats) -> list:
+    """Confirm up to `seats` waitlisted students, earliest rsvp_time first."""
+    if seats is not None and seats <= 0:
+        return []
+    nxt = (
+        select(EventRsvp.id)
+        .where(EventRsvp.event_id == event_id, EventRsvp.rsvp_status == WAITLISTED)
+        .order_by(EventRsvp.rsvp_time, EventRsvp.id)
+        .limit(seats)
+        .with_for_update(skip_locked=True)
+    )
+    return list(session.scalars(
+        update(EventRsvp)
+        .where(EventRsvp.id.in_(nxt.scalar_subquery()))
+        .values(rsvp_status="going")
+        .returning(EventRsvp.student_id)
+    ))
+
+
+def _record_promotions(session, club_id, student_ids) -> None:
+    """A promoted waitlister's RSVP counts as activity when the seat is granted."""
+    for student_id in student_ids:
+        record_activity(session, club_id, "rsvp", student_id)
+
+
+def fill_open_seats(session, event_id) -> list:
+    """
+    Promote waitlisted students into any free seats (e.g. after rsvp_limit was
+    raised). Returns the promoted student ids.
+    """
+    session.flush()
+    count, limit, club_id = _lock_event(session, event_id)
+    promoted = _promote(session, event_id, None if limit is None else limit - count)
+    _record_promotions(session, club_id, promoted)
+    if promoted:
+        _bump_rsvp_count(session, event_id, len(promoted))
+    return promoted
+
+
+def waitlist_position(session, event_id, student_id) -> int | None:
+    """1-based position of the student on the event's waitlist, or None if not waitlisted."""
+    mine = session.execute(
+        select(EventRsvp.rsvp_time, EventRsvp.id).where(
+            EventRsvp.event_id == event_id,
+            EventRsvp.student_id == student_id,
+            EventRsvp.rsvp_status == WAITLISTED,
+        )
+    ).first()
+    if mine is None:
+        return None
+    ahead = session.scalar(
+        select(func.count(EventRsvp.id)).where(
+            EventRsvp.event_id == event_id,
+            EventRsvp.rsvp_status == WAITLISTED,
+            tuple_(EventRsvp.rsvp_time, EventRsvp.id) < tuple_(mine.rsvp_time, mine.id),
+        )
+    )
+    return ahead + 1
+
+
+def toggle_rsvp(session, event_id, student_id) -> RsvpResult:
+    """
+    Flip the student's RSVP for an event. Joining takes a seat if one is free and
+    joins the waitlist otherwise; leaving a confirmed seat promotes the next
+    waitlisted student into it.
+    """
+    count, limit, club_id = _lock_event(session, event_id)
+
+    removed = session.execute(
+        delete(EventRsvp)
+        .where(EventRsvp.event_id == event_id, EventRsvp.student_id == student_id)
+        .returning(EventRsvp.rsvp_status)
+    ).first()
+
+    if removed is not None:
+        if removed.rsvp_status not in REGISTERED_STATUSES:
+            return RsvpResult(None, count, 0, [])
+        count -= 1
+        promoted = _promote(session, event_id, None if limit is None else limit - count)
+        _record_promotions(session, club_id, promoted)
+        delta = len(promoted) - 1
+        return RsvpResult(None, _bump_rsvp_count(session, event_id, delta), delta, promoted)
+
+    status = "going" if limit is None or count < limit else WAITLISTED
+    session.execute(
+        pg_insert(EventRsvp)
+        .values(
+            event_id=event_id,
+            student_id=student_id,
+            rsvp_status=status,
+            rsvp_time=datetime.now(timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=[EventRsvp.event_id, EventRsvp.student_id])
+    )
+    if status == WAITLISTED:
+        # not an RSVP yet; it is recorded if and when the seat is granted
+        return RsvpResult(status, count, 0, [])
+    record_activity(session, club_id, "rsvp", student_id)
+    return RsvpResult(status, _bump_rsvp_count(session, event_id, 1), 1, [])
@@ -0,0 +1,169 @@
+# search_index.py
+"""
+In-process inverted index for club search.
+
+Replaces the LIKE '%word%' scan + difflib-per-club loop that smart search used
+to run on every keystroke. Tokens from name / description / purpose map to
+weighted postings; a trigram index over the vocabulary finds typo candidates,
+which are then confirmed with difflib against a small candidate set, so the
+cost of a query depends on the vocabulary hit, not on the number of clubs.
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable
+
+# Relative weight of a hit in each field
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0, "purpose": 1.0}
+
+# Match-quality multipliers
+_EXACT = 1.0
+_PREFIX = 0.8
+_FUZZY = 0.9  # scaled by the similarity ratio
+
+# Upper bound on vocabulary tokens verified with difflib per query word
+_MAX_FUZZY_CANDIDATES = 50
+# Prefix expansion: shorter words would match a large slice of the vocabulary
+_MIN_PREFIX_LEN = 3
+_MAX_PREFIX_EXPANSIONS = 50
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ClubSearchIndex:
+    """Thread-safe token -> club postings with trigram typo tolerance."""
+
+    def __init__(self, tokenize: Callable[[str], list[str]]):
+        self._tokenize = tokenize
+        self._lock = threading.RLock()
+        self._docs: dict = {}                                   # club_id -> stored fields
+        self._doc_tokens: dict = {}                             # club_id -> {token: weight}
+        self._postings: dict[str, dict] = defaultdict(dict)     # token -> {club_id: weight}
+        self._trigram_map: dict[str, set[str]] = defaultdict(set)  # trigram -> tokens
+        self._vocab_sorted: list[str] | None = None             # lazily rebuilt for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---- Maintenance ----
+    def upsert(self, club_id, name: str | None, description: str | None = None,
+               purpose: str | None = None, updated_at=None) -> None:
+        weights: dict[str, float] = {}
+        for field, text in (("name", name), ("description", description), ("purpose", purpose)):
+            for tok in self._tokenize(text or ""):
+                weights[tok] = max(weights.get(tok, 0.0), FIELD_WEIGHTS[field])
+
+        with self._lock:
+            self._drop_postings(club_id)
+            self._docs[club_id] = {
+                "name": name,
+                "description": description,
+                "updated_at": updated_at,
+                "sort_ts": updated_at.timestamp() if updated_at else 0.0,
+            }
+            self._doc_tokens[club_id] = weights
+            for tok, w in weights.items():
+                if tok not in self._postings:
+                    self._add_vocab(tok)
+                self._postings[tok][club_id] = w
+
+    def remove(self, club_id) -> None:
+        with self._lock:
+            self._drop_postings(club_id)
+            self._docs.pop(club_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._doc_tokens.clear()
+            self._postings.clear()
+            self._trigram_map.clear()
+            self._vocab_sorted = None
+
+    def _drop_postings(self, club_id) -> None:
+        for tok in self._doc_tokens.pop(club_id, {}):
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            posting.pop(club_id, None)
+            if not posting:
+                del self._postings[tok]
+                for tri in _trigrams(tok):
+                    bucket = self._trigram_map.get(tri)
+                    if bucket is not None:
+                        bucket.discard(tok)
+                        if not bucket:
+                            del self._trigram_map[tri]
+                self._vocab_sorted = None
+
+    def _add_vocab(self, tok: str) -> None:
+        for tri in _trigrams(tok):
+            self._trigram_map[tri].add(tok)
+        self._vocab_sorted = None
+
+    # ---- Query ----
+    def _expand(self, word: str, cutoff: float) -> Iterable[tuple[str, float]]:
+        """Vocabulary tokens matching a query word, with a match-quality multiplier."""
+        found: dict[str, float] = {}
+        if word in self._postings:
+            found[word] = _EXACT
+
+        if len(word) >= _MIN_PREFIX_LEN:
+            if self._vocab_sorted is None:
+                self._vocab_sorted = sorted(self._postings)
+            vocab = self._vocab_sorted
+            i = bisect.bisect_left(vocab, word)
+            end = min(len(vocab), i + _MAX_PREFIX_EXPANSIONS)
+            while i < end and vocab[i].startswith(word):
+                found.setdefault(vocab[i], _PREFIX)
+                i += 1
+
+        grams = _trigrams(word)
+        shared: dict[str, int] = defaultdict(int)
+        for tri in grams:
+            for tok in self._trigram_map.get(tri, ()):
+                shared[tok] += 1
+        best = sorted(shared.items(), key=lambda kv: kv[1], reverse=True)[:_MAX_FUZZY_CANDIDATES]
+        for tok, _ in best:
+            if tok in found:
+                continue
+            ratio = difflib.SequenceMatcher(None, word, tok).ratio()
+            if ratio >= cutoff:
+                found[tok] = _FUZZY * ratio
+
+        return found.items()
+
+    def search(self, query: str, cutoff: float = 0.82) -> list[tuple[object, float]]:
+        """Return [(club_id, score)] best first; ties broken by most recently updated."""
+        words = self._tokenize(query)
+        if not words:
+            return []
+
+        with self._lock:
+            scores: dict = defaultdict(float)
+            for word in words:
+                per_word: dict = {}
+                for tok, quality in self._expand(word, cutoff):
+                    for club_id, weight in self._postings[tok].items():
+                        s = quality * weight
+                        if s > per_word.get(club_id, 0.0):
+                            per_word[club_id] = s
+                for club_id, s in per_word.items():
+                    scores[club_id] += s
+
+            docs = self._docs
+            ranked = sorted(
+                scores.items(),
+                key=lambda kv: (kv[1], docs[kv[0]]["sort_ts"]),
+                reverse=True,
+            )
+        return [(cid, round(score, 3)) for cid, score in ranked]
+
+    def doc(self, club_id) -> dict | None:
+        return self._docs.get(club_id)
@@ -5,17 +5,24 @@ Creates:
 - 10 clubs
 - 20 events (spread among clubs)
 - OfficerRoles (each student president of one club, officer in all)
+- ClubMemberships (every officer is a member)
 - Reviews (each student reviews some clubs)
 - RSVPs (students attend or RSVP to random events)
+
+seed_bulk() generates a production-shaped dataset for load testing instead:
+
+    python seed_data.py bulk --students 50000 --clubs 2000 --events 100000 --rsvps 1000000
 """
 
 import random
 import uuid
 from datetime import datetime, timedelta
 
-from db_ops import get_session
+from club_stats import rebuild_club_stats
+from rsvps import recount_rsvps
+from db_ops import get_session, require_database_url
 from models import (
-    Student, Club, Event, OfficerRole,
+    Student, Club, Event, OfficerRole, ClubMembership,
     Review, EventRsvp, ClubUpdateHistory
 )
 
@@ -139,6 +146,7 @@ def seed_data():
                 )
                 s.add(role)
                 roles.append(role)
+                s.add(ClubMembership(club_id=c.id, student_id=student.id, joined_at=now))
         s.flush()
 
         # ---- Reviews ----
@@ -181,4 +189,234 @@ def seed_data():
             )
             s.add(history)
 
+        recount_rsvps(s)
+        rebuild_club_stats(s)
+
         print("Database seeded successfully with students, clubs, events, and relations.")
+
+
+# -------------------------------
+# Bulk generator (load testing)
+# -------------------------------
+_BULK_PREFIX = "load"
+_CATEGORY_WORDS = [
+    "Finance", "Consulting", "Robotics", "Debate", "Chess", "Film", "Hiking", "Jazz",
+    "Pre-Med", "Coding", "Theatre", "Photography", "Climate", "Startup", "Poetry", "Dance",
+]
+
+
+def _zipf_cum_weights(n: int, s: float) -> list[float]:
+    """Cumulative weights for ranks 1..n with P(rank k) ~ 1 / k**s."""
+    total, cum = 0.0, []
+    for k in range(1, n + 1):
+        total += 1.0 / k ** s
+        cum.append(total)
+    return cum
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _insert_chunks(session, model, rows, chunk: int) -> int:
+    """executemany INSERT in chunks (batched multi-row VALUES); returns rows written."""
+    from sqlalchemy import insert
+
+    buf, written = [], 0
+    for row in rows:
+        buf.append(row)
+        if len(buf) >= chunk:
+            session.execute(insert(model.__table__), buf)
+            written += len(buf)
+            buf = []
+    if buf:
+        session.execute(insert(model.__table__), buf)
+        written += len(buf)
+    return written
+
+
+def seed_bulk(
+    students: int = 50000,
+    clubs: int = 2000,
+    events: int = 100000,
+    rsvps: int = 1000000,
+    reviews: int | None = None,
+    years: float = 4.0,
+    seed: int = 42,
+    chunk: int = 5000,
+) -> dict:
+    """
+    Append a production-shaped dataset and return row counts per table.
+
+    - memberships: each student joins Pareto(1.5) clubs (at least 1, at most 20),
+      picked by Zipf(1.1) club popularity, so a few clubs hold most members
+    - events: clubs drawn by Zipf(0.9), start times spread from `years` ago to
+      four months ahead on half-hour slots between 9:00 and 21:00
+    - rsvps: ~`rsvps` total, split across events by Pareto(1.2) weights; mostly
+      club members, attendance only on past events; "going" beyond an
+      event's rsvp_limit is waitlisted
+    - reviews: `reviews` (default students / 10) distinct (club, student) pairs
+
+    Deterministic for a given seed; ids and netids are derived from it, so two
+    runs with different seeds can share a database.
+    """
+    from event_lifecycle import status_for
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    tag = f"{_BULK_PREFIX}{seed}"
+    reviews = students // 10 if reviews is None else reviews
+    counts = {}
+
+    def log(msg: str) -> None:
+        print(f"[SEED] {msg}")
+
+    with get_session() as s:
+        # ---- Students ----
+        student_ids = [_uuid(rng) for _ in range(students)]
+        counts["students"] = _insert_chunks(s, Student, (
+            {"id": sid, "netid": f"{tag}-s{i}", "name": f"Load Student {i}",
+             "email": f"{tag}-s{i}@emory.edu", "is_verified": True}
+            for i, sid in enumerate(student_ids)
+        ), chunk)
+        log(f"{counts['students']} students")
+
+        # ---- Clubs (index = popularity rank) ----
+        club_ids = [_uuid(rng) for _ in range(clubs)]
+        counts["clubs"] = _insert_chunks(s, Club, (
+            {"id": cid, "name": f"{rng.choice(_CATEGORY_WORDS)} Society {i}",
+             "description": rng.choice(DESCRIPTIONS), "purpose": rng.choice(DESCRIPTIONS),
+             "contact_email": f"{tag}-c{i}@emory.edu", "status": "active",
+             "verified": rng.random() < 0.3,
+             "last_updated_at": now - timedelta(days=rng.randrange(365))}
+            for i, cid in enumerate(club_ids)
+        ), chunk)
+        log(f"{counts['clubs']} clubs")
+
+        # ---- Memberships (Zipf club popularity) ----
+        club_cum = _zipf_cum_weights(clubs, 1.1)
+        members: list[list[int]] = [[] for _ in range(clubs)]
+
+        def membership_rows():
+            for si, sid in enumerate(student_ids):
+                k = min(20, clubs, int(rng.paretovariate(1.5)))
+                picked = set(rng.choices(range(clubs), cum_weights=club_cum, k=k))
+                for ci in picked:
+                    members[ci].append(si)
+                    yield {"club_id": club_ids[ci], "student_id": sid,
+                           "joined_at": now - timedelta(days=rng.randrange(int(365 * years) or 1))}
+
+        counts["club_memberships"] = _insert_chunks(s, ClubMembership, membership_rows(), chunk)
+        log(f"{counts['club_memberships']} memberships")
+
+        # ---- Officers: a president and up to four officers per club ----
+        def officer_rows():
+            for ci, cid in enumerate(club_ids):
+                pool = members[ci]
+                if not pool:
+                    continue
+                chosen = rng.sample(pool, min(len(pool), 1 + rng.randrange(5)))
+                for rank, si in enumerate(chosen):
+                    yield {"club_id": cid, "student_id": student_ids[si],
+                           "role": "president" if rank == 0 else "officer", "assigned_at": now}
+
+        counts["officer_roles"] = _insert_chunks(s, OfficerRole, officer_rows(), chunk)
+
+        # ---- Events (multi-year history) ----
+        event_cum = _zipf_cum_weights(clubs, 0.9)
+        history_days = int(365 * years)
+        event_club = rng.choices(range(clubs), cum_weights=event_cum, k=events)
+        event_ids = [_uuid(rng) for _ in range(events)]
+        event_start, event_limit = [], []
+
+        def event_rows():
+            for ei, (eid, ci) in enumerate(zip(event_ids, event_club)):
+                day = now.replace(hour=0, minute=0) + timedelta(days=rng.randrange(-history_days, 120))
+                start = day + timedelta(minutes=30 * rng.randrange(18, 42))
+                limit = rng.choice((None, None, None, 25, 50, 100, 200))
+                event_start.append(start)
+                event_limit.append(limit)
+                yield {"id": eid, "club_id": club_ids[ci], "title": f"Event {ei}",
+                       "description": "Generated load-test event.", "location": rng.choice(LOCATIONS),
+                       "start_time": start, "end_time": start + timedelta(hours=rng.choice((1, 2, 3))),
+                       "status": status_for(start), "rsvp_limit": limit}
+
+        counts["events"] = _insert_chunks(s, Event, event_rows(), chunk)
+        log(f"{counts['events']} events")
+
+        # ---- RSVPs (power-law per event) ----
+        weights = [rng.paretovariate(1.2) for _ in range(events)]
+        scale = rsvps / sum(weights) if weights else 0
+
+        def rsvp_rows():
+            for ei, eid in enumerate(event_ids):
+                want = min(students, int(weights[ei] * scale))
+                if want <= 0:
+                    continue
+                pool = members[event_club[ei]]
+                picked = set(rng.sample(pool, min(len(pool), int(want * 0.8))))
+                while len(picked) < want:
+                    picked.add(rng.randrange(students))
+                past, limit, seats = event_start[ei] < now, event_limit[ei], 0
+                for si in picked:
+                    going = rng.random() < 0.7
+                    status = "going" if going else "interested"
+                    if limit is not None and seats >= limit:
+                        status, going = "waitlisted", False
+                    else:
+                        seats += 1
+                    yield {"event_id": eid, "student_id": student_ids[si],
+                           "rsvp_status": status,
+                           "rsvp_time": event_start[ei] - timedelta(days=rng.randrange(1, 21)),
+                           "attended": past and going and rng.random() < 0.6}
+
+        counts["event_rsvps"] = _insert_chunks(s, EventRsvp, rsvp_rows(), chunk)
+        log(f"{counts['event_rsvps']} rsvps")
+
+        # ---- Reviews ----
+        def review_rows():
+            seen = set()
+            for _ in range(reviews):
+                pair = (rng.choices(range(clubs), cum_weights=club_cum)[0], rng.randrange(students))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield {"club_id": club_ids[pair[0]], "student_id": student_ids[pair[1]],
+                       "rating": rng.choices((1, 2, 3, 4, 5), weights=(1, 2, 5, 12, 10))[0],
+                       "review_text": "Generated review.", "status": "approved"}
+
+        counts["reviews"] = _insert_chunks(s, Review, review_rows(), chunk)
+
+        # ---- Derived tables ----
+        recount_rsvps(s)
+        rebuild_club_stats(s)
+        log(f"done: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Seed the ECN database")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("sample", help="Small hand-written dataset (10 students, 10 clubs)")
+    bulk = sub.add_parser("bulk", help="Large synthetic dataset for load testing")
+    bulk.add_argument("--students", type=int, default=50000)
+    bulk.add_argument("--clubs", type=int, default=2000)
+    bulk.add_argument("--events", type=int, default=100000)
+    bulk.add_argument("--rsvps", type=int, default=1000000)
+    bulk.add_argument("--reviews", type=int, default=None, help="default: students / 10")
+    bulk.add_argument("--years", type=float, default=4.0, help="event history length")
+    bulk.add_argument("--seed", type=int, default=42)
+    bulk.add_argument("--chunk", type=int, default=5000, help="rows per INSERT batch")
+    args = parser.parse_args()
+    require_database_url(f"seed_data {args.cmd}")
+
+    if args.cmd == "sample":
+        seed_data()
+    else:
+        t0 = time.perf_counter()
+        seed_bulk(students=args.students, clubs=args.clubs, events=args.events, rsvps=args.rsvps,
+                  reviews=args.reviews, years=args.years, seed=args.seed, chunk=args.chunk)
+        print(f"[SEED] finished in {time.perf_counter() - t0:.1f}s")
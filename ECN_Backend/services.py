@@ -1,10 +1,15 @@
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 from db_ops import get_session
-from models import Club, Event, Review, Student
-import difflib
+from models import Club, ClubStats, Event, Student
+from club_stats import event_saved, init_club_stats
+from event_format import next_event_summary
+from event_lifecycle import status_for, upcoming_clause
+from search_index import ClubSearchIndex
+from cache import TTLCache
+from pagination import DEFAULT_PAGE_SIZE, SortKey, order_clauses, paginate
 from sqlalchemy import func, or_
-import hmac, hashlib, base64, os, uuid, json, re
+import hmac, hashlib, base64, os, uuid, json, re, threading, time
 from werkzeug.security import generate_password_hash, check_password_hash
 from email.message import EmailMessage
 
@@ -18,6 +23,16 @@ _FRONTEND_BASE = os.getenv("ECN_FRONTEND_BASE", "http://localhost:3000")
 _BACKEND_BASE = os.getenv("ECN_BACKEND_BASE", "http://127.0.0.1:5000")
 _VERIFY_TTL_MIN = int(os.getenv("ECN_VERIFY_TTL_MIN", "15"))
 
+#Resolved users per session check (profile fields only, no roles); refreshed on login/register.
+#Per-process: another worker keeps serving its copy for up to ECN_USER_CACHE_TTL seconds.
+_USER_CACHE = TTLCache(
+    maxsize=int(os.getenv("ECN_USER_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("ECN_USER_CACHE_TTL", "60")),
+)
+
+#Club search backend: "memory" (in-process inverted index) or "postgres" (tsvector + pg_trgm, GIN indexed)
+_SEARCH_ENGINE = os.getenv("ECN_SEARCH_ENGINE", "memory").strip().lower()
+
 #===== Email configurations ======
 #When we deploy, we will need to change dev to smtp. Right now, it will simply return the email.
 #When the mode changes, it will actually send an email (I am thinking of using either AMAZON SES or SendGrid. That is not yet implemented)
@@ -39,11 +54,6 @@ def _normalize_text(s: str) -> str:
 def _tokenize(s: str) -> list[str]:
     return _normalize_text(s).split()
 
-def _fuzzy_any_match(q_word: str, title_words: list[str], cutoff: float = 0.82) -> bool:
-    if q_word in title_words:
-        return True
-    return bool(difflib.get_close_matches(q_word, title_words, n=1, cutoff=cutoff))
-
 # ===== New Helpers for Sprint 6 (Email verification and user authoritization) ======
 def _now_ts() -> int:
     #for token expirations and issued-times
@@ -79,20 +89,46 @@ def _unsign(token: str) -> Optional[str]:
     except Exception:
         return None
 
+def _issue_session_token(user: Dict[str, Any]) -> str:
+    #Signed token carrying only the user id plus issue/expiry times; auth_me reads the profile server-side
+    issued = _now_ts()
+    claims = {"sub": user["id"], "iat": issued, "exp": issued + _MAX_AGE}
+    _USER_CACHE.set(user["id"], user)
+    return _sign(json.dumps(claims, separators=(",", ":")))
+
+def _load_user(uid: str) -> Dict[str, Any]:
+    with get_session() as s:
+        stu = s.get(Student, uuid.UUID(uid))
+        if not stu:
+            raise ValueError("User not found.")
+        return _serialize_student(stu)
+
 def auth_me(token: str) -> Dict[str, Any]:
-    #Resolve current user from the cookie token
+    #Resolve current user from the cookie token. The token only proves who the caller is;
+    #the profile comes from _USER_CACHE, and a miss costs one primary-key read of students
+    #(so a renamed, re-verified or deleted student is seen once the entry expires).
     raw = _unsign(token or "")
     if not raw:
         raise ValueError("Invalid session.")
+
     try:
-        uid, email, issued_str = raw.split("|", 2)
+        if raw.startswith("{"):
+            claims = json.loads(raw)
+            uid, expires = claims["sub"], int(claims["exp"])
+        else:
+            # Legacy "uid|email|issued" tokens
+            uid, email, issued_str = raw.split("|", 2)
+            expires = int(issued_str) + _MAX_AGE
     except Exception:
         raise ValueError("Invalid session.")
-    with get_session() as s:
-        stu = s.get(Student, uuid.UUID(uid))
-        if not stu:
-            raise ValueError("User not found.")
-        return {"user": _serialize_student(stu)}
+    if expires <= _now_ts():
+        raise ValueError("Session expired.")
+
+    user = _USER_CACHE.get(uid)
+    if user is None:
+        user = _load_user(uid)
+        _USER_CACHE.set(uid, user)
+    return {"user": user}
 
 def auth_cookie_name() -> str:
     #Just for typos, we can delete this thought it could avoid an edge case
@@ -126,28 +162,69 @@ def create_club(payload: dict) -> str:
         c = Club(name=payload["name"], description=payload.get("description", ""))
         s.add(c)
         s.flush()
+        init_club_stats(s, c.id)
+        index_club(c.id, c.name, c.description, None, datetime.now(timezone.utc))
         return str(c.id)
 
 # ---- Events ----
-def list_events(upcoming_only: bool = True) -> List[Dict[str, Any]]:
-    with get_session() as s:
-        q = s.query(Event, Club).join(Club, Event.club_id == Club.id)
-        if upcoming_only:
-            q = q.filter(Event.start_time >= datetime.now(timezone.utc))
+# Without a limit/cursor, /api/events returns at most this many events
+_EVENTS_MAX_UNPAGED = int(os.getenv("ECN_EVENTS_MAX_UNPAGED", "1000"))
+
+def _event_query(s, upcoming_only: bool, starts_from: Optional[datetime] = None,
+                 starts_before: Optional[datetime] = None, club_ids: Optional[list] = None,
+                 location: Optional[str] = None, statuses: Optional[list[str]] = None):
+    q = s.query(Event, Club).join(Club, Event.club_id == Club.id)
+    if upcoming_only:
+        q = q.filter(upcoming_clause(datetime.now(timezone.utc)))
+    # date range and club filters ride ix_events_start / ix_events_club_start
+    if starts_from is not None:
+        q = q.filter(Event.start_time >= starts_from)
+    if starts_before is not None:
+        q = q.filter(Event.start_time < starts_before)
+    if club_ids:
+        q = q.filter(Event.club_id.in_(club_ids))
+    if location:
+        q = q.filter(Event.location.icontains(location, autoescape=True))
+    if statuses:
+        q = q.filter(Event.status.in_(statuses))
+    return q
+
+def _event_item(e: Event, c: Club) -> Dict[str, Any]:
+    return {
+        "id": str(e.id),
+        "clubId": str(e.club_id),
+        "clubName": c.name,           # ← Add this
+        "club_verified": c.verified,  # ← Add this
+        "title": e.title,
+        "startTime": e.start_time.isoformat(),
+        "endTime": e.end_time.isoformat() if e.end_time else None,
+        "location": e.location,
+        "status": e.status
+    }
+
+# Soonest first; id breaks ties between events starting together
+EVENT_PAGE_KEYS = [SortKey(Event.start_time), SortKey(Event.id)]
 
+def list_events(upcoming_only: bool = True, **filters) -> List[Dict[str, Any]]:
+    """Events soonest first, capped at ECN_EVENTS_MAX_UNPAGED; filters as in _event_query."""
+    with get_session() as s:
+        results = (
+            _event_query(s, upcoming_only, **filters)
+            .order_by(*order_clauses(EVENT_PAGE_KEYS))
+            .limit(_EVENTS_MAX_UNPAGED)
+            .all()
+        )
+        return [_event_item(e, c) for e, c in results]  # ← Note: unpacking (e, c) tuple
 
-        results = q.order_by(Event.start_time.asc()).all()
-        return [{
-            "id": str(e.id),
-            "clubId": str(e.club_id),
-            "clubName": c.name,           # ← Add this
-            "club_verified": c.verified,  # ← Add this
-            "title": e.title,
-            "startTime": e.start_time.isoformat(),
-            "endTime": e.end_time.isoformat() if e.end_time else None,
-            "location": e.location,
-            "status": e.status
-        } for e, c in results]  # ← Note: unpacking (e, c) tuple
+def list_events_page(upcoming_only: bool = True, limit: int = DEFAULT_PAGE_SIZE,
+                     after: Optional[str] = None, **filters) -> Dict[str, Any]:
+    """One keyset page of list_events, soonest first: {"items", "nextCursor"}."""
+    with get_session() as s:
+        rows, next_cursor = paginate(
+            _event_query(s, upcoming_only, **filters), EVENT_PAGE_KEYS, "events", limit, after,
+            key_of=lambda row: (row[0].start_time, row[0].id),
+        )
+        return {"items": [_event_item(e, c) for e, c in rows], "nextCursor": next_cursor}
 
 
 def create_event(payload: dict) -> str:
@@ -156,94 +233,162 @@ def create_event(payload: dict) -> str:
     if missing:
         raise ValueError(f"Missing: {', '.join(missing)}")
 
+    start_time = datetime.fromisoformat(payload["startTime"])
     with get_session() as s:
         evt = Event(
             club_id=payload["clubId"],
             title=payload["title"],
             description=payload.get("description"),
             location=payload.get("location"),
-            start_time=datetime.fromisoformat(payload["startTime"]),
+            start_time=start_time,
             end_time=datetime.fromisoformat(payload["endTime"]),
+            status=status_for(start_time),
         )
         s.add(evt)
-        s.flush()
+        event_saved(s, evt)
         return str(evt.id)
 
-# ---- Smart Search (Simplified) ----
-def search_clubs_smart(q: str = "", tags: list[str] | None = None, fuzzy_cutoff: float = 0.82) -> Dict[str, Any]:
-    q_norm = _normalize_text(q)
-    q_words = _tokenize(q_norm)
-
+# ---- Smart Search ----
+# Each worker process keeps its own index; it is patched in place by create/update
+# calls in this process and re-synced from Club.updated_at at most every
+# _SEARCH_REFRESH_SEC to pick up writes made by other workers.
+_SEARCH_REFRESH_SEC = float(os.getenv("ECN_SEARCH_REFRESH_SEC", "30"))
+# updated_at is the writer's transaction start, so a slow commit can land behind
+# the watermark; each sync re-reads this window before it
+_SEARCH_SYNC_OVERLAP = timedelta(seconds=float(os.getenv("ECN_SEARCH_SYNC_OVERLAP_SEC", "60")))
+_club_index = ClubSearchIndex(tokenize=_tokenize)
+_club_index_state = {"loaded": False, "watermark": None, "count": 0, "checked": 0.0}
+_club_index_lock = threading.Lock()
+
+def index_club(club_id, name: str | None, description: str | None, purpose: str | None, updated_at) -> None:
+    #Push a club's searchable text into the in-process index after create/update
+    _club_index.upsert(club_id, name, description, purpose, updated_at)
+
+def _sync_club_index(session) -> ClubSearchIndex:
+    state = _club_index_state
+    if state["loaded"] and time.monotonic() - state["checked"] < _SEARCH_REFRESH_SEC:
+        return _club_index
+
+    with _club_index_lock:
+        watermark, count = session.query(func.max(Club.updated_at), func.count(Club.id)).one()
+        cols = (Club.id, Club.name, Club.description, Club.purpose, Club.updated_at)
+        if state["loaded"] and state["watermark"] is not None:
+            since = state["watermark"] - _SEARCH_SYNC_OVERLAP
+            for cid, name, description, purpose, updated_at in session.query(*cols).filter(Club.updated_at > since):
+                _club_index.upsert(cid, name, description, purpose, updated_at)
+
+        # First use, or clubs were deleted elsewhere: a delete plus an insert keeps
+        # the row count, but leaves the index holding one club too many
+        if not state["loaded"] or len(_club_index) != count:
+            _club_index.clear()
+            for cid, name, description, purpose, updated_at in session.query(*cols).all():
+                _club_index.upsert(cid, name, description, purpose, updated_at)
+
+        state.update(loaded=True, watermark=watermark, count=count, checked=time.monotonic())
+    return _club_index
+
+def _pg_club_search(q: str):
+    """(match clause, relevance expression) for the Postgres search engine."""
+    tsq = func.websearch_to_tsquery("english", q)
+    match = or_(Club.search_vector.bool_op("@@")(tsq), Club.name.bool_op("%")(q))
+    relevance = func.ts_rank_cd(Club.search_vector, tsq) + func.similarity(Club.name, q)
+    return match, relevance
+
+def _search_clubs_pg(q: str, limit: Optional[int], offset: int) -> Dict[str, Any]:
+    match, relevance = _pg_club_search(q)
     with get_session() as s:
-        base = s.query(Club)
-        if q_words:
-            like_clauses = []
-            for w in q_words:
-                pat = f"%{w}%"
-                like_clauses.append(func.lower(Club.name).like(pat))
-                like_clauses.append(func.lower(Club.description).like(pat))
-            base = base.filter(or_(*like_clauses))
-
-        candidates = base.order_by(Club.updated_at.desc()).all()
-
-        matched_ids = set()
-        for c in candidates:
-            name_words = _tokenize(c.name)
-            if q_words and any(_fuzzy_any_match(qw, name_words, cutoff=fuzzy_cutoff) for qw in q_words):
-                matched_ids.add(c.id)
-
-        matched = [c for c in candidates if c.id in matched_ids]
+        base = s.query(Club.id, Club.name, Club.description, Club.updated_at).filter(match)
+        total = base.count()
+        rows = base.add_columns(relevance.label("score")).order_by(
+            relevance.desc(), Club.updated_at.desc(), Club.id
+        ).offset(offset)
+        if limit is not None:
+            rows = rows.limit(limit)
         items = [{
-            "id": str(c.id),
-            "name": c.name,
-            "description": c.description,
-            "updatedAt": c.updated_at.isoformat()
-        } for c in matched]
-        return {"items": items, "total": len(items)}
+            "id": str(cid),
+            "name": name,
+            "description": description,
+            "updatedAt": updated_at.isoformat(),
+            "score": round(float(score), 3),
+        } for cid, name, description, updated_at, score in rows.all()]
+    return {"items": items, "total": total}
+
+def search_clubs_smart(
+    q: str = "",
+    tags: list[str] | None = None,
+    fuzzy_cutoff: float = 0.82,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    if not _tokenize(q):
+        return {"items": [], "total": 0}
 
-def _avg_rating_for_club(session, club_id) -> float:
-    # average rating; default to 4.6 if no reviews
-    row = session.query(func.avg(Review.rating)).filter(Review.club_id == club_id).one()
-    try:
-        val = float(row[0]) if row[0] is not None else 4.6
-    except Exception:
-        val = 4.6
-    return round(val, 1)
-
-def _next_event_for_club(session, club_id) -> Optional[dict]:
-    now = datetime.now(timezone.utc)
-    evt = (
-        session.query(Event)
-        .filter(Event.club_id == club_id, Event.start_time >= now)
-        .order_by(Event.start_time.asc())
-        .first()
-    )
-    if not evt:
-        return None
-    
-    # Convert UTC to EST/EDT for display
-    from zoneinfo import ZoneInfo
-    est_time = evt.start_time.replace(tzinfo=timezone.utc).astimezone(ZoneInfo("America/New_York"))
-    
-    date_str = est_time.strftime("%b %d")
-    time_str = est_time.strftime("%-I:%M %p")
-    
-    return {
-        "name": evt.title,
-        "date": date_str,
-        "time": time_str,
-        "location": evt.location or "TBD",
-    }
+    if _SEARCH_ENGINE == "postgres":
+        return _search_clubs_pg(q, limit, offset)
+
+    with get_session() as s:
+        index = _sync_club_index(s)
+
+    hits = index.search(q, cutoff=fuzzy_cutoff)
+    page = hits[offset:offset + limit] if limit is not None else hits[offset:]
+
+    items = []
+    for club_id, score in page:
+        doc = index.doc(club_id)
+        if doc is None:
+            continue
+        items.append({
+            "id": str(club_id),
+            "name": doc["name"],
+            "description": doc["description"],
+            "updatedAt": doc["updated_at"].isoformat() if doc["updated_at"] else None,
+            "score": score,
+        })
+    return {"items": items, "total": len(hits)}
+
+def _ranking_keys(sort_by: str) -> List[SortKey]:
+    """
+    Sort keys for a club listing, applied inside the database so that pages
+    follow the global ranking. Each order is exactly the column order of one
+    index (ix_clubs_updated_id, ix_club_stats_rank_*), so a page is read off
+    the index in order with no sort step.
+    """
+    if sort_by == "updated":
+        return [SortKey(Club.updated_at, descending=True), SortKey(Club.id, descending=True)]
+
+    metric = {
+        "members": ClubStats.member_count,
+        "rating": ClubStats.avg_rating,
+        "activity": ClubStats.activity_score,
+    }.get(sort_by, ClubStats.discoverability_index)  # default: discoverability
+    return [SortKey(metric, descending=True), SortKey(ClubStats.club_id)]
+
+
+def _club_listing(session, q: str, verified_only: bool, sort_by: str):
+    """(filtered Club + ClubStats query, sort keys) behind one club listing."""
+    # every club has a stats row (written with the club, rebuilt by db_ops)
+    query = session.query(Club, ClubStats).join(ClubStats, ClubStats.club_id == Club.id)
+
+    if q and _SEARCH_ENGINE == "postgres":
+        match, relevance = _pg_club_search(q)
+        query = query.filter(match)
+    elif q:
+        pattern = f"%{q.lower()}%"
+        query = query.filter(
+            func.lower(Club.name).like(pattern)
+            | func.lower(Club.description).like(pattern)
+            | func.lower(Club.purpose).like(pattern)
+        )
+
+    if verified_only:
+        query = query.filter(Club.verified.is_(True))
 
-def _activity_score(upcoming_count: int, verified: bool) -> int:
-    base = min(100, upcoming_count * 8)
-    if verified:
-        base += 10
-    return min(100, base)
+    if q and _SEARCH_ENGINE == "postgres" and sort_by == "relevance":
+        keys = [SortKey(relevance, descending=True), *_ranking_keys("updated")]
+    else:
+        keys = _ranking_keys(sort_by)
+    return query, keys
 
-def _discoverability_index(activity: int, members: int) -> int:
-    # simple composite metric
-    return min(100, activity + min(40, members // 5))
 
 def list_clubs(
     q: str = "",
@@ -254,60 +399,43 @@ def list_clubs(
     sort_by: str = "discoverability",
     limit: int = 50,
     offset: int = 0,
+    after: Optional[str] = None,
+    include_total: Optional[bool] = None,
 ) -> Dict[str, Any]:
-    with get_session() as s:
-        query = s.query(Club)
+    """
+    One page of the club directory. Pass the previous page's nextCursor as
+    `after` to continue (offset is only honoured without a cursor). The total
+    match count is a separate COUNT query, run when include_total is true;
+    by default only for the first page.
+    """
+    if include_total is None:
+        include_total = not after and not offset
 
-        if q:
-            pattern = f"%{q.lower()}%"
-            query = query.filter(
-                func.lower(Club.name).like(pattern)
-                | func.lower(Club.description).like(pattern)
-                | func.lower(Club.purpose).like(pattern)
-            )
-
-        if verified_only:
-            query = query.filter(Club.verified.is_(True))
+    with get_session() as s:
+        query, keys = _club_listing(s, q, verified_only, sort_by)
 
         # total BEFORE pagination
-        total = query.count()
-
-        # simple recency ordering first (we’ll re-sort after computing metrics if needed)
-        clubs = (
-            query
-            .order_by(Club.updated_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        total = query.count() if include_total else None
+
+        # rank in the database so each page walks the global order
+        ranked = query.add_columns(*(k.column for k in keys))
+        if offset and not after:
+            ranked = ranked.offset(offset)
+        rows, next_cursor = paginate(ranked, keys, f"clubs:{sort_by}", limit, after)
+        rows = [(c, st) for c, st, *_ in rows]
+
+        next_ids = [st.next_event_id for _, st in rows if st.next_event_id]
+        next_events = (
+            {e.id: e for e in s.query(Event).filter(Event.id.in_(next_ids)).all()}
+            if next_ids else {}
         )
 
         # Build enriched items expected by the UI
         items: List[Dict[str, Any]] = []
-        now = datetime.now(timezone.utc)
-
-        # Preload upcoming events per club (counts) to compute activity
-        upcoming_counts = {
-            c.id: s.query(func.count(Event.id))
-                    .filter(Event.club_id == c.id, Event.start_time >= now)
-                    .scalar()
-            for c in clubs
-        }
-
-        for c in clubs:
-            member_set = set(c.member_ids or [])
-            member_set.update(c.officers or [])
-            # Add members from OfficerRole table
-            from models import OfficerRole
-            officer_role_rows = s.query(OfficerRole).filter(OfficerRole.club_id == c.id).all()
-            for role in officer_role_rows:
-                member_set.add(role.student_id)
-            members_count = len(member_set)
-
-            verified = bool(c.verified)
-            rating = _avg_rating_for_club(s, c.id)
-            next_evt = _next_event_for_club(s, c.id)
-            activity = _activity_score(upcoming_counts.get(c.id, 0), verified)
-            discover = _discoverability_index(activity, members_count)
+
+        for c, st in rows:
+            next_evt_row = next_events.get(st.next_event_id)
+            next_evt = next_event_summary(next_evt_row) if next_evt_row else None
 
             items.append({
                 "id": str(c.id),
@@ -315,35 +443,22 @@ def list_clubs(
                 "description": c.description,
                 "category": "General",             # placeholder; no category field in model
                 "school": [],                      # placeholder; no school list in model
-                "members": members_count,
-                "rating": rating,
-                "verified": verified,
+                "members": st.member_count,
+                "rating": float(st.avg_rating),
+                "verified": bool(c.verified),
                 "lastUpdatedISO": c.updated_at.isoformat(),
                 "nextEvent": next_evt,
                 "website": c.request_info_form_url,  # best available url-ish field
                 "contactEmail": c.contact_email, 
                 "tags": [],                        # placeholder; no tags model
-                "activityScore": activity,
-                "discoverabilityIndex": discover,
+                "activityScore": st.activity_score,
+                "discoverabilityIndex": st.discoverability_index,
             })
 
-        # Sort on the server side as requested
-        def _key(item):
-            if sort_by == "members":
-                return item["members"]
-            if sort_by == "rating":
-                return item["rating"]
-            if sort_by == "activity":
-                return item["activityScore"]
-            if sort_by == "updated":
-                return item["lastUpdatedISO"]
-            # default: discoverability
-            return item["discoverabilityIndex"]
-
-        reverse = sort_by != "updated"  # updated: newest first (max ISO)
-        items.sort(key=_key, reverse=reverse)
-
-        return {"items": items, "total": total}
+        page: Dict[str, Any] = {"items": items, "nextCursor": next_cursor}
+        if total is not None:
+            page["total"] = total
+        return page
 
 def auth_register(name: str, email: str, password: str) -> Dict[str, Any]:
     #Creates and updates a user. Stores password hash, marks verification and triggers the email
@@ -366,8 +481,8 @@ def auth_register(name: str, email: str, password: str) -> Dict[str, Any]:
         stu.is_verified = True
         user = _serialize_student(stu)
 
-    issued = _now_ts()
-    session_token = _sign(f"{user['id']}|{user['email']}|{issued}")
+    # re-verification: _issue_session_token replaces the cached entry
+    session_token = _issue_session_token(user)
     return {"user": user, "token": session_token, "maxAge": _MAX_AGE}
 """
 def complete_verification(token: str) -> Dict[str, Any]:
@@ -410,7 +525,6 @@ def auth_login(email: str, password: str) -> Dict[str, Any]:
             raise ValueError("Incorrect email or password.")
         user = _serialize_student(stu)
 
-    issued = _now_ts()
-    token = _sign(f"{user['id']}|{user['email']}|{issued}")
+    token = _issue_session_token(user)
     return {"user": user, "token": token, "maxAge": _MAX_AGE}
 
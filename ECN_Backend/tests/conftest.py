@@ -0,0 +1,61 @@
+# tests/conftest.py
+"""
+The tests run against a scratch Postgres database named by ECN_TEST_DATABASE_URL
+(the models use Postgres types, so SQLite cannot stand in). Without it every
+test that needs the database is skipped.
+
+    cd ECN_Backend && ECN_TEST_DATABASE_URL=postgresql+psycopg2://postgres@localhost/ecn_test python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+TEST_DB_URL = os.getenv("ECN_TEST_DATABASE_URL")
+if TEST_DB_URL:
+    # db_ops builds its engine at import time
+    os.environ["ECN_DATABASE_URL"] = TEST_DB_URL
+# measure the routes, not cache hits (read when response_cache is imported)
+os.environ["ECN_RESPONSE_CACHE"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DB_URL:
+        pytest.skip("set ECN_TEST_DATABASE_URL to a scratch Postgres database")
+    from flask import Flask
+
+    from db_ops import create_all
+    from routes import api_bp
+
+    create_all()
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix="/api")
+    return app
+
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager factory: `with count_statements() as n:` ... n["statements"]."""
+    from contextlib import contextmanager
+
+    from sqlalchemy import event
+
+    from db_ops import engine
+
+    @contextmanager
+    def counting():
+        counter = {"statements": 0}
+
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            counter["statements"] += 1
+
+        event.listen(engine, "after_cursor_execute", _after)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "after_cursor_execute", _after)
+
+    return counting
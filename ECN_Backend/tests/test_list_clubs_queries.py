@@ -0,0 +1,94 @@
+# tests/test_list_clubs_queries.py
+"""
+GET /api/clubs runs a fixed number of statements however many clubs a page
+holds, and every sort order is read off an index without a sort step.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+N_CLUBS = 30
+
+
+@pytest.fixture(scope="module")
+def clubs(app):
+    from club_stats import refresh_club_stats
+    from db_ops import get_session
+    from memberships import add_member
+    from models import Club, Event, OfficerRole, Review, Student
+
+    tag = f"nplus1-{uuid.uuid4().hex[:8]}"
+    start = datetime.now(timezone.utc) + timedelta(days=3)
+    with get_session() as s:
+        students = [
+            Student(netid=f"{tag}-s{i}", name=f"student {i}", email=f"{tag}-s{i}@example.edu")
+            for i in range(3)
+        ]
+        clubs = [Club(name=f"{tag} club {i}", description="n+1 fixture") for i in range(N_CLUBS)]
+        s.add_all(students + clubs)
+        s.flush()
+        for i, club in enumerate(clubs):
+            for st in students:
+                add_member(s, club.id, st.id)
+            s.add(OfficerRole(club_id=club.id, student_id=students[0].id, role="president"))
+            s.add(Review(club_id=club.id, student_id=students[1].id, rating=1 + i % 5))
+            for d in range(2):
+                begins = start + timedelta(days=d, hours=i)
+                s.add(Event(club_id=club.id, title=f"event {d}", start_time=begins,
+                            end_time=begins + timedelta(hours=1)))
+        s.flush()
+        refresh_club_stats(s, [c.id for c in clubs])
+        club_ids, student_ids = [c.id for c in clubs], [st.id for st in students]
+
+    yield tag
+
+    with get_session() as s:
+        s.execute(delete(Club).where(Club.id.in_(club_ids)))
+        s.execute(delete(Student).where(Student.id.in_(student_ids)))
+
+
+@pytest.mark.parametrize("sort", ["discoverability", "members", "rating", "updated"])
+def test_list_clubs_statement_count_is_bounded(app, clubs, count_statements, sort):
+    client = app.test_client()
+    url = f"/api/clubs?q={clubs}&sort={sort}&limit="
+    client.get(url + "1")  # connection / mapper setup is not the route's cost
+
+    counts = {}
+    for limit in (1, 5, N_CLUBS):
+        with count_statements() as n:
+            resp = client.get(url + str(limit))
+        assert resp.status_code == 200
+        assert len(resp.get_json()["items"]) == limit
+        counts[limit] = n["statements"]
+
+    assert counts[1] == counts[5] == counts[N_CLUBS], counts
+    assert counts[N_CLUBS] <= 8, counts
+
+
+def _plan_nodes(plan: dict):
+    yield plan["Node Type"]
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+@pytest.mark.parametrize("sort", ["discoverability", "members", "rating", "activity", "updated"])
+def test_club_page_reads_an_index_in_order(app, clubs, sort):
+    from sqlalchemy import text
+
+    from db_ops import get_session
+    from pagination import order_clauses
+    from services import _club_listing
+
+    with get_session() as s:
+        query, keys = _club_listing(s, "", False, sort)
+        page = query.add_columns(*(k.column for k in keys)).order_by(*order_clauses(keys)).limit(51)
+        sql = page.statement.compile(dialect=s.bind.dialect, compile_kwargs={"literal_binds": True})
+        # a small test table would otherwise be seq-scanned and sorted regardless of indexes
+        s.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = s.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+
+    nodes = list(_plan_nodes(plan[0]["Plan"]))
+    assert not any("Sort" in n for n in nodes), nodes
+    assert any(n.startswith("Index") for n in nodes), nodes
@@ -0,0 +1,136 @@
+# tests/test_pagination.py
+"""
+Cursor encoding and keyset comparison. No Postgres needed: keyset_after is
+checked against an in-memory SQLite table by paging through it and comparing
+with a single ordered read.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, select
+
+from pagination import (
+    MAX_PAGE_SIZE, InvalidCursor, SortKey, decode_cursor, encode_cursor, keyset_after, order_clauses, page_size,
+)
+
+
+def _token(obj) -> str:
+    raw = obj if isinstance(obj, bytes) else json.dumps(obj).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# ---- cursors ----
+
+def test_cursor_round_trip_keeps_types():
+    values = [datetime(2025, 3, 1, 18, 30, tzinfo=timezone.utc), uuid.uuid4(), 42, 4.5, "x", None]
+    token = encode_cursor("clubs:rating", values)
+    assert "=" not in token
+    assert decode_cursor(token, "clubs:rating", len(values)) == values
+
+
+def test_cursor_is_bound_to_its_ordering():
+    token = encode_cursor("clubs:rating", [4.5, uuid.uuid4()])
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "clubs:members", 2)
+
+
+def test_cursor_key_count_must_match():
+    token = encode_cursor("events", [datetime.now(timezone.utc), uuid.uuid4()])
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "events", 3)
+
+
+@pytest.mark.parametrize("token", [
+    "",
+    "not a cursor!",
+    _token(b"\xff\xfe not json"),
+    _token([1, 2]),
+    _token({"o": "events"}),
+    _token({"o": "events", "k": 5}),
+    _token({"o": "events", "k": [{"d": "yesterday"}, 1]}),
+    _token({"o": "events", "k": [{"u": "not-a-uuid"}, 1]}),
+])
+def test_garbage_and_tampered_cursors_are_rejected(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "events", 2)
+
+
+def test_page_size_is_clamped():
+    assert page_size(None) == 50
+    assert page_size("7") == 7
+    assert page_size("0") == 1
+    assert page_size("-3") == 1
+    assert page_size("100000") == MAX_PAGE_SIZE
+    assert page_size("ten", default=20) == 20
+
+
+# ---- keyset_after ----
+
+_meta = MetaData()
+_rows = Table(
+    "rows", _meta,
+    Column("id", Integer, primary_key=True),
+    Column("score", Integer, nullable=True),
+    Column("name", String, nullable=False),
+    Column("seen", String, nullable=True),  # ISO timestamps, NULL for some rows
+)
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    _meta.create_all(engine)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    data = [
+        {
+            "id": i,
+            "score": None if i % 4 == 0 else i % 3,   # NULLs and plenty of ties
+            "name": f"n{i % 5}",
+            "seen": None if i % 6 == 0 else (base + timedelta(hours=i % 7)).isoformat(),
+        }
+        for i in range(1, 41)
+    ]
+    with engine.begin() as conn:
+        conn.execute(_rows.insert(), data)
+    return engine
+
+
+def _walk(conn, keys, size):
+    """Every id, one keyset page at a time."""
+    seen, last = [], None
+    while True:
+        stmt = select(_rows.c.id, *(k.column for k in keys)).order_by(*order_clauses(keys)).limit(size)
+        if last is not None:
+            stmt = stmt.where(keyset_after(keys, last))
+        page = conn.execute(stmt).all()
+        if not page:
+            return seen
+        seen += [r[0] for r in page]
+        last = list(page[-1][1:])
+
+
+@pytest.mark.parametrize("keys", [
+    [SortKey(_rows.c.id)],
+    [SortKey(_rows.c.id, descending=True)],
+    [SortKey(_rows.c.score, descending=True, nullable=True), SortKey(_rows.c.id)],
+    [SortKey(_rows.c.score, nullable=True), SortKey(_rows.c.id, descending=True)],
+    [SortKey(_rows.c.name), SortKey(_rows.c.seen, descending=True, nullable=True), SortKey(_rows.c.id)],
+    [SortKey(_rows.c.seen, nullable=True), SortKey(_rows.c.score, descending=True, nullable=True),
+     SortKey(_rows.c.id)],
+], ids=["id", "id-desc", "score-desc-nulls", "score-asc-nulls", "name-seen-desc", "seen-score-desc"])
+@pytest.mark.parametrize("size", [1, 3, 7])
+def test_keyset_pages_match_one_ordered_read(db, keys, size):
+    with db.connect() as conn:
+        full = [r[0] for r in conn.execute(select(_rows.c.id).order_by(*order_clauses(keys)))]
+        assert _walk(conn, keys, size) == full
+
+
+def test_nothing_sorts_after_the_last_null(db):
+    keys = [SortKey(_rows.c.score, nullable=True), SortKey(_rows.c.id)]
+    with db.connect() as conn:
+        last_id = conn.execute(select(_rows.c.id).order_by(*order_clauses(keys)).limit(1).offset(39)).scalar()
+        after = conn.execute(select(_rows.c.id).where(keyset_after(keys, [None, last_id]))).all()
+    assert after == []
@@ -0,0 +1,159 @@
+# tests/test_search_index.py
+"""
+ClubSearchIndex behaviour (prefix bound, removal) and the services-side sync
+that keeps it in step with the clubs table. No Postgres needed: the sync is
+driven through a stand-in session that serves rows from a list.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import search_index
+import services
+from search_index import ClubSearchIndex
+
+NO_FUZZY = 1.01  # SequenceMatcher ratios never exceed 1.0
+
+
+def _index():
+    return ClubSearchIndex(tokenize=services._tokenize)
+
+
+# ---- prefix expansion ----
+
+def test_prefix_expansion_is_bounded():
+    idx = _index()
+    for i in range(search_index._MAX_PREFIX_EXPANSIONS * 3):
+        idx.upsert(uuid.uuid4(), f"robotics{i:04d}")
+    assert len(idx.search("robotics", cutoff=NO_FUZZY)) == search_index._MAX_PREFIX_EXPANSIONS
+
+
+def test_short_words_do_not_expand_as_prefixes():
+    idx = _index()
+    idx.upsert(uuid.uuid4(), "chess")
+    idx.upsert(uuid.uuid4(), "chemistry")
+    assert idx.search("ch", cutoff=NO_FUZZY) == []
+    assert len(idx.search("che", cutoff=NO_FUZZY)) == 2
+
+
+def test_exact_match_survives_a_crowded_prefix():
+    idx = _index()
+    exact = uuid.uuid4()
+    for i in range(search_index._MAX_PREFIX_EXPANSIONS * 2):
+        idx.upsert(uuid.uuid4(), f"art{i:04d}")
+    idx.upsert(exact, "art")
+    assert idx.search("art", cutoff=NO_FUZZY)[0][0] == exact
+
+
+# ---- removal ----
+
+def test_removed_club_leaves_no_postings():
+    idx = _index()
+    gone, kept = uuid.uuid4(), uuid.uuid4()
+    idx.upsert(gone, "Quidditch League", "brooms")
+    idx.upsert(kept, "Quiz Bowl", "trivia")
+    assert {cid for cid, _ in idx.search("qui")} == {gone, kept}
+
+    idx.remove(gone)
+    assert len(idx) == 1
+    assert idx.doc(gone) is None
+    assert [cid for cid, _ in idx.search("qui")] == [kept]
+    assert idx.search("brooms") == []
+    assert idx.search("quidditch") == []
+
+
+def test_upsert_replaces_old_tokens():
+    idx = _index()
+    cid = uuid.uuid4()
+    idx.upsert(cid, "Debate Society")
+    idx.upsert(cid, "Model UN")
+    assert idx.search("debate") == []
+    assert [c for c, _ in idx.search("model")] == [cid]
+
+
+# ---- services._sync_club_index ----
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def filter(self, clause):
+        since = clause.right.value  # Club.updated_at > since
+        return _Rows([r for r in self._rows if r[4] > since])
+
+    def one(self):
+        return self._rows[0]
+
+    def all(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class _Session:
+    """Serves the two query shapes _sync_club_index issues from a list of club rows."""
+
+    def __init__(self, clubs):
+        self.clubs = clubs
+
+    def query(self, *cols):
+        if len(cols) == 2:  # (max(updated_at), count(id))
+            return _Rows([(max((c[4] for c in self.clubs), default=None), len(self.clubs))])
+        return _Rows(self.clubs)
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(services, "_club_index", _index())
+    monkeypatch.setattr(services, "_club_index_state", {"loaded": False, "watermark": None, "count": 0, "checked": 0.0})
+    monkeypatch.setattr(services, "_SEARCH_REFRESH_SEC", 0)
+    return services._club_index
+
+
+def _club(name, updated_at):
+    return (uuid.uuid4(), name, "", None, updated_at)
+
+
+def test_sync_drops_deleted_clubs(fresh_index):
+    t0 = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    chess, go = _club("Chess Club", t0), _club("Go Club", t0)
+    session = _Session([chess, go])
+    services._sync_club_index(session)
+    assert len(fresh_index) == 2
+
+    session.clubs = [go]
+    services._sync_club_index(session)
+    assert len(fresh_index) == 1
+    assert fresh_index.search("chess") == []
+
+
+def test_sync_drops_a_club_deleted_alongside_an_insert(fresh_index):
+    t0 = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    chess, go = _club("Chess Club", t0), _club("Go Club", t0)
+    session = _Session([chess, go])
+    services._sync_club_index(session)
+
+    # same row count as before, so only the index size gives the delete away
+    shogi = _club("Shogi Club", t0 + timedelta(minutes=5))
+    session.clubs = [go, shogi]
+    services._sync_club_index(session)
+    assert len(fresh_index) == 2
+    assert fresh_index.search("chess") == []
+    assert [c for c, _ in fresh_index.search("shogi")] == [shogi[0]]
+
+
+def test_sync_picks_up_late_commits_inside_the_overlap(fresh_index):
+    t0 = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    chess, rowing = _club("Chess Club", t0 + timedelta(minutes=10)), _club("Rowing Club", t0)
+    session = _Session([chess, rowing])
+    services._sync_club_index(session)
+
+    # an edit committed after the last sync but stamped before its watermark;
+    # the row count is unchanged, so only the overlap window can catch it
+    renamed = (rowing[0], "Sailing Club", "", None, chess[4] - services._SEARCH_SYNC_OVERLAP / 2)
+    session.clubs = [chess, renamed]
+    services._sync_club_index(session)
+    assert [c for c, _ in fresh_index.search("sailing")] == [rowing[0]]
+    assert fresh_index.search("rowing") == []
@@ -0,0 +1,17 @@
+# wsgi.py
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Background jobs are not started here; with preload_app the module is imported
+in the gunicorn master, and threads do not survive fork. gunicorn.conf.py
+starts them in each worker instead. Other WSGI servers that import this module
+per worker process can set ECN_START_JOBS=true. The pool warmup does not depend
+on either: /api/ready starts it in any process where it has not run yet.
+"""
+import os
+
+from app import create_app
+
+app = create_app(start_jobs=os.getenv("ECN_START_JOBS", "false").lower() == "true")